@@ -5,10 +5,25 @@ Loads configuration from environment variables with fallbacks to config.json fil
 """
 
 import os
-import json
 import sys
 from typing import Dict, Any
 
+# orjson is optional; fall back to the stdlib json module when it's missing
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+except ImportError:
+    import json
+
+    _loads = json.loads
+
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, indent=2)
+
 # Path to the configuration file
 CONFIG_FILE = os.path.join(os.path.dirname(__file__), "config.json")
 
@@ -25,46 +40,54 @@ DEFAULT_CONFIG = {
     "allow_write": False
 }
 
+# String values accepted as "true" for boolean settings
+_TRUTHY = frozenset(("true", "1", "yes", "y", "on"))
+
+# (key, environment variable, default) for each config key, built once
+_ENV_LOOKUP = tuple((k, f"SNOWFLAKE_{k.upper()}", v) for k, v in DEFAULT_CONFIG.items())
+
 def load_config_from_file() -> Dict[str, Any]:
     """Load configuration from JSON file."""
     try:
-        if os.path.exists(CONFIG_FILE):
-            with open(CONFIG_FILE, "r") as f:
-                return json.load(f)
-        else:
-            print(f"[SNOWFLAKE MCP CONFIG] Warning: Config file {CONFIG_FILE} not found", file=sys.stderr)
-            return {}
+        with open(CONFIG_FILE, "rb") as f:
+            return _loads(f.read())
+    except FileNotFoundError:
+        print(f"[SNOWFLAKE MCP CONFIG] Warning: Config file {CONFIG_FILE} not found", file=sys.stderr)
+        return {}
     except Exception as e:
         print(f"[SNOWFLAKE MCP CONFIG] Error loading config file: {str(e)}", file=sys.stderr)
         return {}
 
-# Load configuration from file
-file_config = load_config_from_file()
+# The config file is only read once an environment variable is missing
+_file_config = None
+
+def _get_file_config() -> Dict[str, Any]:
+    """Load the config file on first use and memoize the result."""
+    global _file_config
+    if _file_config is None:
+        _file_config = load_config_from_file()
+    return _file_config
 
 # Create the configuration with environment variable overrides
 config = {}
 
-for key, default in DEFAULT_CONFIG.items():
-    # Environment variable takes precedence
-    env_key = f"SNOWFLAKE_{key.upper()}"
-    if env_key in os.environ:
-        config[key] = os.environ[env_key]
-    # Then file config
-    elif key in file_config:
-        config[key] = file_config[key]
-    # Then default
-    else:
-        config[key] = default
+# Snapshot the environment once; plain dict reads skip the os.environ proxy
+_environ = dict(os.environ)
+for key, env_key, default in _ENV_LOOKUP:
+    # Environment variable takes precedence, then file config, then default
+    try:
+        config[key] = _environ[env_key]
+    except KeyError:
+        config[key] = _get_file_config().get(key, default)
 
 # Special handling for boolean values
 if isinstance(config["debug"], str):
-    config["debug"] = config["debug"].lower() in ["true", "1", "yes"]
+    config["debug"] = config["debug"].lower() in _TRUTHY
 if isinstance(config["allow_write"], str):
-    config["allow_write"] = config["allow_write"].lower() in ["true", "1", "yes"]
+    config["allow_write"] = config["allow_write"].lower() in _TRUTHY
 
 # Log the configuration (without password for security)
+# Only pay for the masking and serialization when debug output is enabled
 if config["debug"]:
-    safe_config = config.copy()
-    if safe_config["password"]:
-        safe_config["password"] = "***********"
-    print(f"[SNOWFLAKE MCP CONFIG] Loaded configuration: {json.dumps(safe_config, indent=2)}", file=sys.stderr)
\ No newline at end of file
+    safe_config = {**config, "password": "***********" if config["password"] else config["password"]}
+    print(f"[SNOWFLAKE MCP CONFIG] Loaded configuration: {_dumps(safe_config)}", file=sys.stderr)
\ No newline at end of file
@@ -3,16 +3,9 @@
 Simple TCP server for Snowflake MCP using FastMCP.
 """
 import os
-import sys
 import asyncio
 import logging
 
-# Add src to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
-
-# Now we can import our server
-from server import mcp, config, auth_client, db
-
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -46,6 +39,10 @@ async def main():
     """Run TCP server."""
     port = int(os.getenv("TCP_PORT", "8765"))
     
+    # Import the server lazily so argument/env handling doesn't pay for the
+    # Snowflake connector import
+    from server import mcp, config, auth_client, db
+    
     # Import and initialize the MCP app
     logger.info(f"Starting Snowflake MCP TCP server on port {port}")
     
@@ -85,5 +82,10 @@ async def main():
     ).serve()
 
 
+def main_sync():
+    """Synchronous entry point for running the TCP server."""
+    asyncio.run(main())
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    main_sync()
\ No newline at end of file
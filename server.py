@@ -7,104 +7,502 @@ It supports dynamic authentication through chat without requiring configuration
 
 from mcp.server.fastmcp import FastMCP, Context
 import os
+import re
 import sys
 import json
+import time
+import asyncio
+import inspect
+from functools import lru_cache, wraps
+from operator import itemgetter
+from types import MappingProxyType
 from typing import Optional, Dict, Any, List
 from pathlib import Path
 
 # Add src directory to path so we can import our modules
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
+# orjson is optional; fall back to the stdlib json module when it's missing.
+# Used for config parsing, status text and the Cortex prompt/response; tool
+# payloads keep going through json.
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumps_indented(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+    def _dumps_compact(obj: Any) -> str:
+        return orjson.dumps(obj, default=str).decode()
+except ImportError:
+    _loads = json.loads
+
+    def _dumps_indented(obj: Any) -> str:
+        return json.dumps(obj, indent=2)
+
+    def _dumps_compact(obj: Any) -> str:
+        return json.dumps(obj, separators=(",", ":"), default=str)
+
 # Import our modules
 from mcp_snowflake_server.auth import SnowflakeAuthClient
 from mcp_snowflake_server.db_client import SnowflakeDB
 from mcp_snowflake_server.write_detector import SQLWriteDetector
 
+# Placeholder detection, compiled once. Identifiers are rejected if they contain
+# angle brackets or the word "placeholder"; SQL text only on the template
+# forms like "<database>" or "<orders_table>" so comparisons still work.
+_NAME_PLACEHOLDER_RE = re.compile(r"[<>]|placeholder", re.IGNORECASE)
+_QUERY_PLACEHOLDER_RE = re.compile(r"<(?:database>|schema>|table|\w+_table>)|placeholder", re.IGNORECASE)
+
+# Unquoted Snowflake identifier (after upper-casing); used for the database
+# qualifier in INFORMATION_SCHEMA queries, which can't be a bound parameter
+_IDENTIFIER_RE = re.compile(r"^[A-Z_][A-Z0-9_$]*$")
+
+# Fully qualified database.schema.table of unquoted identifiers; splits,
+# validates and rejects "placeholder" names in one pass, so the parts are safe
+# to interpolate (angle brackets can't match an identifier anyway)
+_FQN_RE = re.compile(r"^(?!.*(?i:placeholder))([A-Za-z_][\w$]*)\.([A-Za-z_][\w$]*)\.([A-Za-z_][\w$]*)$")
+
+# Table reference with one to three unquoted parts, for statements such as
+# DESCRIBE TABLE where the name can't be a bound parameter
+_TABLE_REF_RE = re.compile(r"[A-Za-z_][\w$]*(?:\.[A-Za-z_][\w$]*){0,2}")
+
+# Row projections for list_tables and describe_table
+_TABLE_FIELDS = itemgetter("TABLE_NAME", "TABLE_TYPE", "ROW_COUNT", "BYTES", "COMMENT")
+_TABLE_KEYS = ("name", "type", "row_count", "bytes", "comment")
+_COLUMN_FIELDS = itemgetter("COLUMN_NAME", "DATA_TYPE", "IS_NULLABLE", "COLUMN_DEFAULT", "COMMENT")
+_IS_NULLABLE = {"YES": True, "NO": False}
+
+# Row projections for search_tables and get_data_summary
+_SEARCH_FIELDS = itemgetter("DATABASE_NAME", "SCHEMA_NAME", "TABLE_NAME", "TABLE_COMMENT", "ROW_COUNT", "BYTES")
+_LARGEST_FIELDS = itemgetter("DATABASE_NAME", "SCHEMA_NAME", "TABLE_NAME", "ROW_COUNT", "BYTES", "SIZE_GB")
+_RECENT_FIELDS = itemgetter("DATABASE_NAME", "SCHEMA_NAME", "TABLE_NAME", "CREATED", "LAST_ALTERED", "ROW_COUNT")
+
+# SHOW commands return at most this many rows
+_SHOW_ROW_LIMIT = 10000
+
+# INFORMATION_SCHEMA lookups. The view is bound through IDENTIFIER(?) as
+# "<DATABASE>.INFORMATION_SCHEMA.<VIEW>" (see _info_schema) along with the
+# schema and table names, so the SQL text is the same for every database and
+# Snowflake can reuse the compiled statement.
+_LIST_TABLES_SQL = """
+    SELECT TABLE_NAME, TABLE_TYPE, ROW_COUNT, BYTES, COMMENT 
+    FROM IDENTIFIER(?) 
+    WHERE TABLE_SCHEMA = ?
+    ORDER BY TABLE_NAME
+"""
+
+_DESCRIBE_TABLE_SQL = """
+    SELECT COLUMN_NAME, DATA_TYPE, IS_NULLABLE, COLUMN_DEFAULT, COMMENT
+    FROM IDENTIFIER(?)
+    WHERE TABLE_SCHEMA = ?
+    AND TABLE_NAME = ?
+    ORDER BY ORDINAL_POSITION
+"""
+
+_SCHEMA_COLUMNS_SQL = """
+    SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE, IS_NULLABLE, COLUMN_DEFAULT, COMMENT
+    FROM IDENTIFIER(?)
+    WHERE TABLE_SCHEMA = ?
+    ORDER BY TABLE_NAME, ORDINAL_POSITION
+"""
+
+_PROFILE_COLUMNS_SQL = """
+    SELECT 
+        COLUMN_NAME,
+        DATA_TYPE,
+        IS_NULLABLE,
+        COLUMN_DEFAULT,
+        COMMENT
+    FROM IDENTIFIER(?)
+    WHERE TABLE_NAME = ?
+    AND TABLE_SCHEMA = ?
+    AND TABLE_CATALOG = ?
+"""
+
+def _info_schema(database: str, view: str) -> str:
+    """Name of an INFORMATION_SCHEMA view for binding to IDENTIFIER(?); database must be validated"""
+    return f"{database}.INFORMATION_SCHEMA.{view}"
+
+# get_table_relationships: outgoing FKs, incoming FKs and the primary key in
+# one round trip. Each branch matches the target table by equality and is
+# tagged with KIND; self-references are reported once, as outgoing. Every
+# REFERENTIAL_CONSTRAINTS row is already a foreign key, so no TABLE_CONSTRAINTS
+# join is needed there; only the columns the tool reads are projected.
+# {info_schema} is the target database's INFORMATION_SCHEMA; the table's
+# database, schema and name are bound once, in the target CTE.
+_RELATIONSHIPS_SQL = """
+    WITH target AS (
+        SELECT ? AS TABLE_CATALOG, ? AS TABLE_SCHEMA, ? AS TABLE_NAME
+    ),
+    rel AS (
+        SELECT 
+            fk.CONSTRAINT_NAME,
+            fk.TABLE_CATALOG as FK_DATABASE,
+            fk.TABLE_SCHEMA as FK_SCHEMA,
+            fk.TABLE_NAME as FK_TABLE,
+            fk.COLUMN_NAME as FK_COLUMN,
+            pk.TABLE_CATALOG as PK_DATABASE,
+            pk.TABLE_SCHEMA as PK_SCHEMA,
+            pk.TABLE_NAME as PK_TABLE,
+            pk.COLUMN_NAME as PK_COLUMN,
+            fk.ORDINAL_POSITION
+        FROM {info_schema}.REFERENTIAL_CONSTRAINTS rc
+        JOIN {info_schema}.KEY_COLUMN_USAGE fk
+            ON rc.CONSTRAINT_CATALOG = fk.CONSTRAINT_CATALOG
+            AND rc.CONSTRAINT_SCHEMA = fk.CONSTRAINT_SCHEMA
+            AND rc.CONSTRAINT_NAME = fk.CONSTRAINT_NAME
+        JOIN {info_schema}.KEY_COLUMN_USAGE pk
+            ON rc.UNIQUE_CONSTRAINT_CATALOG = pk.CONSTRAINT_CATALOG
+            AND rc.UNIQUE_CONSTRAINT_SCHEMA = pk.CONSTRAINT_SCHEMA
+            AND rc.UNIQUE_CONSTRAINT_NAME = pk.CONSTRAINT_NAME
+    )
+    SELECT 'OUT' AS KIND, rel.*
+    FROM rel JOIN target t
+        ON rel.FK_DATABASE = t.TABLE_CATALOG
+        AND rel.FK_SCHEMA = t.TABLE_SCHEMA
+        AND rel.FK_TABLE = t.TABLE_NAME
+    UNION ALL
+    SELECT 'IN' AS KIND, rel.*
+    FROM rel JOIN target t
+        ON rel.PK_DATABASE = t.TABLE_CATALOG
+        AND rel.PK_SCHEMA = t.TABLE_SCHEMA
+        AND rel.PK_TABLE = t.TABLE_NAME
+    WHERE NOT (rel.FK_DATABASE = t.TABLE_CATALOG
+        AND rel.FK_SCHEMA = t.TABLE_SCHEMA
+        AND rel.FK_TABLE = t.TABLE_NAME)
+    UNION ALL
+    SELECT 'PK' AS KIND, NULL,
+        NULL, NULL, NULL, NULL, NULL, NULL, NULL, kc.COLUMN_NAME, kc.ORDINAL_POSITION
+    FROM {info_schema}.KEY_COLUMN_USAGE kc
+    JOIN {info_schema}.TABLE_CONSTRAINTS tc
+        ON kc.CONSTRAINT_CATALOG = tc.CONSTRAINT_CATALOG
+        AND kc.CONSTRAINT_SCHEMA = tc.CONSTRAINT_SCHEMA
+        AND kc.CONSTRAINT_NAME = tc.CONSTRAINT_NAME
+    JOIN target t
+        ON kc.TABLE_CATALOG = t.TABLE_CATALOG
+        AND kc.TABLE_SCHEMA = t.TABLE_SCHEMA
+        AND kc.TABLE_NAME = t.TABLE_NAME
+        -- Redundant with the constraint join, but lets the table filter
+        -- reach TABLE_CONSTRAINTS directly
+        AND tc.TABLE_CATALOG = t.TABLE_CATALOG
+        AND tc.TABLE_SCHEMA = t.TABLE_SCHEMA
+        AND tc.TABLE_NAME = t.TABLE_NAME
+    WHERE tc.CONSTRAINT_TYPE = 'PRIMARY KEY'
+    ORDER BY KIND, CONSTRAINT_NAME, ORDINAL_POSITION
+    """
+
+# Structured-output schema cortex_analyst asks CORTEX.COMPLETE for, as a
+# Snowflake object constant
+_CORTEX_RESPONSE_FORMAT = (
+    "{'type': 'json_object', 'schema': {'type': 'object', 'properties': {"
+    "'answer': {'type': 'string'}, "
+    "'sql_query': {'type': 'string'}, "
+    "'insights': {'type': 'array', 'items': {'type': 'string'}}"
+    "}, 'required': ['answer', 'sql_query']}}"
+)
+
+# Aggregate expressions computed per column by profile_table, as (field, SQL template)
+_NUMERIC_STATS = (
+    ("min", "MIN({c})"),
+    ("max", "MAX({c})"),
+    ("avg", "AVG({c})"),
+    ("median", "MEDIAN({c})"),
+    ("distinct_count", "COUNT(DISTINCT {c})"),
+    ("null_count", "COUNT_IF({c} IS NULL)"),
+)
+_TEXT_STATS = (
+    ("distinct_count", "COUNT(DISTINCT {c})"),
+    ("null_count", "COUNT_IF({c} IS NULL)"),
+    ("min_length", "MIN(LENGTH({c}))"),
+    ("max_length", "MAX(LENGTH({c}))"),
+    ("avg_length", "AVG(LENGTH({c}))"),
+)
+
+def _is_numeric_type(data_type: str) -> bool:
+    """Whether a Snowflake DATA_TYPE gets numeric rather than length statistics"""
+    return "NUMBER" in data_type or "INT" in data_type or "FLOAT" in data_type
+
+@lru_cache(maxsize=256)
+def _build_stats_sql(table_name: str, columns: tuple) -> str:
+    """
+    Build profile_table's single-scan statistics query.
+    
+    columns is a tuple of (column_name, is_numeric) pairs; each aggregate is
+    aliased C{i}_{FIELD} and the row count is added as ROW_COUNT.
+    """
+    select_list = [
+        f"{expr.format(c=name)} AS C{i}_{field.upper()}"
+        for i, (name, is_numeric) in enumerate(columns)
+        for field, expr in (_NUMERIC_STATS if is_numeric else _TEXT_STATS)
+    ]
+    select_list.append("COUNT(*) AS ROW_COUNT")
+    return "SELECT\n    " + ",\n    ".join(select_list) + f"\nFROM {table_name}"
+
 # Create config module
 config = {}
 
 # Create an MCP server
 mcp = FastMCP("Snowflake")
 
+# String values accepted as "true" for boolean settings
+_TRUTHY = frozenset({"true", "1", "yes", "y", "on"})
+
+def _to_bool(value: Any) -> bool:
+    """Interpret a config value (bool or string such as "yes"/"0") as a boolean"""
+    if isinstance(value, str):
+        return value.strip().lower() in _TRUTHY
+    return bool(value)
+
+# Whether debug output is on; seeded from the environment so config loading can
+# log, then widened once the config (and any --debug flag) is known
+_DEBUG_ENABLED = _to_bool(os.environ.get("SNOWFLAKE_DEBUG", ""))
+
 # Debug function
 def debug_print(message: str):
     """Print debug messages to stderr"""
-    if config.get("debug") or os.environ.get("SNOWFLAKE_DEBUG", "false").lower() in ["true", "1", "yes"]:
+    if _DEBUG_ENABLED:
         print(f"[SNOWFLAKE MCP DEBUG] {message}", file=sys.stderr)
 
-# Load configuration
-def load_config():
-    """Load configuration from file and environment"""
-    global config
-    
-    # Default configuration
-    DEFAULT_CONFIG = {
-        "account": None,
-        "user": None,
-        "password": None,
-        "warehouse": None,
-        "database": None,
-        "schema": None,
-        "role": None,
-        "debug": False,
-        "allow_write": False
-    }
-    
-    # Try to load from config.json
-    config_file = os.path.join(os.path.dirname(__file__), "config.json")
-    file_config = {}
-    
+# Default configuration
+DEFAULT_CONFIG = {
+    "account": None,
+    "user": None,
+    "password": None,
+    "warehouse": None,
+    "database": None,
+    "schema": None,
+    "role": None,
+    "debug": False,
+    "allow_write": False
+}
+
+# Config keys that are passed through to the Snowflake connection
+_CONN_KEYS = frozenset({"account", "user", "password", "warehouse", "database", "schema", "role"})
+
+@lru_cache(maxsize=1)
+def _read_file_config(config_file: str) -> Dict[str, Any]:
+    """Parse config.json once; later calls reuse the parsed dict"""
     try:
-        if os.path.exists(config_file):
-            with open(config_file, "r") as f:
-                file_config = json.load(f)
-                debug_print(f"Loaded configuration from {config_file}")
+        file_config = _loads(Path(config_file).read_bytes())
+    except FileNotFoundError:
+        return {}
     except Exception as e:
         debug_print(f"Error loading config file: {str(e)}")
+        return {}
+    debug_print(f"Loaded configuration from {config_file}")
+    return file_config
+
+# Config keys whose environment values are JSON (booleans or the full config
+# object); everything else, credentials and identifiers included, stays a string
+_JSON_ENV_KEYS = frozenset({"debug", "allow_write", "config_json"})
+
+def _process_env_vars(prefix: str = "SNOWFLAKE_") -> Dict[str, Any]:
+    """
+    Snapshot the prefixed environment variables once, keyed by config name.
     
-    # Build config with environment variable overrides
-    config = {}
-    for key, default in DEFAULT_CONFIG.items():
-        # Environment variable takes precedence
-        env_key = f"SNOWFLAKE_{key.upper()}"
-        if env_key in os.environ:
-            config[key] = os.environ[env_key]
-        # Then file config
-        elif key in file_config:
-            config[key] = file_config[key]
-        # Then default
-        else:
-            config[key] = default
+    Only the keys in _JSON_ENV_KEYS are JSON-decoded, so "true" or '{"k": "v"}'
+    arrive typed there; a password of "false" or "123" stays a string.
+    """
+    env_config = {}
+    for k, v in os.environ.items():
+        if not k.startswith(prefix):
+            continue
+        key = k[len(prefix):].lower()
+        if key in _JSON_ENV_KEYS:
+            try:
+                v = json.loads(v)
+            except ValueError:
+                pass
+        env_config[key] = v
+    return env_config
+
+# Load configuration
+def load_config() -> MappingProxyType:
+    """Load configuration from file and environment"""
+    file_config = _read_file_config(os.path.join(os.path.dirname(__file__), "config.json"))
+    env_config = _process_env_vars()
+    
+    # Environment variables take precedence, then the file, then defaults
+    loaded = {
+        **DEFAULT_CONFIG,
+        **{k: file_config[k] for k in DEFAULT_CONFIG if k in file_config},
+        **{k: env_config[k] for k in DEFAULT_CONFIG if k in env_config}
+    }
+    
+    # A complete JSON config in SNOWFLAKE_CONFIG_JSON overrides everything else
+    config_json = env_config.get("config_json")
+    if isinstance(config_json, dict):
+        loaded.update(config_json)
+    elif config_json is not None:
+        debug_print("Ignoring SNOWFLAKE_CONFIG_JSON: expected a JSON object")
     
-    # Special handling for boolean values
-    if isinstance(config["debug"], str):
-        config["debug"] = config["debug"].lower() in ["true", "1", "yes"]
-    if isinstance(config["allow_write"], str):
-        config["allow_write"] = config["allow_write"].lower() in ["true", "1", "yes"]
+    # Remaining string booleans such as "yes" or "0"
+    for key in ("debug", "allow_write"):
+        loaded[key] = _to_bool(loaded[key])
     
-    return config
+    return MappingProxyType(loaded)
 
 # Load configuration on startup
 config = load_config()
+_DEBUG_ENABLED = _DEBUG_ENABLED or config["debug"]
+_ALLOW_WRITE = config["allow_write"]
 
 # Initialize clients
 auth_client = SnowflakeAuthClient()
 db = None
 write_detector = SQLWriteDetector()
 
+@lru_cache(maxsize=1024)
+def _contains_write(query: str) -> bool:
+    """Whether query contains a write operation; sqlparse runs once per distinct query"""
+    return write_detector.analyze_query(query)['contains_write']
+
 # Check if we have pre-configured credentials
 if config.get("account") and config.get("user") and config.get("password"):
     debug_print("Using pre-configured authentication")
-    connection_params = {
-        k: v for k, v in config.items() 
-        if k in ["account", "user", "password", "warehouse", "database", "schema", "role"] and v
-    }
+    connection_params = {k: v for k, v in config.items() if k in _CONN_KEYS and v}
     auth_client.set_credentials(connection_params)
     db = SnowflakeDB(connection_params)
     # Note: We'll initialize the connection on first use since we can't await here
 else:
     debug_print("Starting in dynamic authentication mode")
 
+# INFORMATION_SCHEMA listings and searches are effectively static within a
+# session, so successful results are cached as
+# key -> (timestamp, result, upper-cased argument names) for _IS_TTL seconds
+_IS_CACHE: Dict[tuple, tuple] = {}
+_IS_TTL = 60.0
+# Locks for keys with a request in flight; dropped once it finishes
+_IS_LOCKS: Dict[tuple, asyncio.Lock] = {}
+
+def _prune_metadata_cache():
+    """Drop cached metadata older than _IS_TTL"""
+    cutoff = time.monotonic() - _IS_TTL
+    for key in [key for key, entry in _IS_CACHE.items() if entry[0] < cutoff]:
+        del _IS_CACHE[key]
+
+def _cache_metadata(fn):
+    """
+    Cache a metadata tool's successful results, keyed by its exact arguments.
+    
+    A tool that takes a refresh argument can pass refresh=True to skip the
+    cached entry; the fresh result still replaces it.
+    """
+    signature = inspect.signature(fn)
+    
+    @wraps(fn)
+    async def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        refresh = bound.arguments.pop("refresh", False)
+        key = (fn.__name__, json.dumps(bound.arguments, sort_keys=True, default=str))
+        
+        cached = _IS_CACHE.get(key)
+        if cached and not refresh and time.monotonic() - cached[0] < _IS_TTL:
+            return cached[1]
+        
+        # Concurrent identical requests wait for the first one instead of all
+        # hitting Snowflake
+        lock = _IS_LOCKS.setdefault(key, asyncio.Lock())
+        async with lock:
+            try:
+                cached = _IS_CACHE.get(key)
+                if cached and not refresh and time.monotonic() - cached[0] < _IS_TTL:
+                    return cached[1]
+                result = await fn(*args, **kwargs)
+                if result.get('success'):
+                    _prune_metadata_cache()
+                    # Upper-cased names let _invalidate_metadata match them
+                    # against a write query
+                    names = tuple(None if v is None else str(v).upper() for v in bound.arguments.values())
+                    _IS_CACHE[key] = (time.monotonic(), result, names)
+                return result
+            finally:
+                # Waiters already queued on this lock re-check the cache;
+                # later requests start from a fresh lock
+                if _IS_LOCKS.get(key) is lock:
+                    del _IS_LOCKS[key]
+    
+    return wrapper
+
+def _placeholder_table_error(table_name: str) -> Dict[str, Any]:
+    """Error result for a table name that still contains a template placeholder"""
+    return {
+        'success': False,
+        'error': f'Table name contains placeholder value: "{table_name}". Please use an actual table name from list_tables or search_tables.',
+        'hint': 'First use list_tables or search_tables to find actual table names, then use the fully qualified name (database.schema.table).'
+    }
+
+_NOT_AUTH_RESULT = {
+    'success': False,
+    'error': 'Not authenticated. Please use authenticate_snowflake first.'
+}
+
+def _require_auth(fn):
+    """Return the not-authenticated error instead of calling fn while db is unset"""
+    @wraps(fn)
+    async def wrapper(*args, **kwargs):
+        if db is None:
+            return dict(_NOT_AUTH_RESULT)
+        return await fn(*args, **kwargs)
+    
+    return wrapper
+
+def _catch_errors(fn):
+    """Turn an exception raised by a tool into an error result"""
+    @wraps(fn)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await fn(*args, **kwargs)
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    return wrapper
+
+def _invalidate_metadata(query: Optional[str] = None):
+    """
+    Drop cached metadata after a write or a change of connection.
+    
+    With a query, only entries naming an identifier that appears in the query
+    (plus the database listing and unfiltered searches) are dropped; without
+    one, everything is.
+    """
+    if query is None:
+        _IS_CACHE.clear()
+        return
+    query_upper = query.upper()
+    for key, (_, _, names) in list(_IS_CACHE.items()):
+        # Dotted names (database.schema.table) also match on their last part,
+        # since writes often use unqualified names
+        if not names or None in names or any(
+            name in query_upper or name.rpartition(".")[2] in query_upper for name in names
+        ):
+            _IS_CACHE.pop(key, None)
+
+# The saved-credentials listing decrypts a file on every read; keep it briefly
+# as (timestamp, listing) and drop it whenever credentials are saved or deleted
+_SAVED_CACHE: Optional[tuple] = None
+_SAVED_TTL = 5.0
+
+async def _list_saved_credentials() -> Dict[str, List[str]]:
+    """Saved account/user listing, re-read at most every _SAVED_TTL seconds"""
+    global _SAVED_CACHE
+    if _SAVED_CACHE and time.monotonic() - _SAVED_CACHE[0] < _SAVED_TTL:
+        return _SAVED_CACHE[1]
+    saved = await asyncio.to_thread(auth_client.storage.list_saved_credentials)
+    _SAVED_CACHE = (time.monotonic(), saved)
+    return saved
+
+def _invalidate_saved_credentials():
+    """Forget the cached listing after the credentials file changes"""
+    global _SAVED_CACHE
+    _SAVED_CACHE = None
+
 
 # Authentication status resource
 @mcp.resource("snowflake://auth/status")
@@ -120,10 +518,10 @@ async def auth_status() -> str:
 - Schema: {params.get('schema', 'Not set')}
 - Status: ✓ Connected"""
     else:
-        saved = auth_client.storage.list_saved_credentials()
+        saved = await _list_saved_credentials()
         if saved:
             return f"""Not authenticated. Saved credentials available for:
-{json.dumps(saved, indent=2)}
+{_dumps_indented(saved)}
 
 Use 'authenticate_snowflake' tool to connect."""
         else:
@@ -158,25 +556,22 @@ async def authenticate_snowflake(
     """
     global db
     
-    # Build connection parameters
+    # Build connection parameters, leaving out unset optional ones
+    optional = {
+        'warehouse': warehouse,
+        'database': database,
+        'schema': schema,
+        'role': role
+    }
     connection_params = {
         'account': account,
         'user': user,
-        'password': password
+        'password': password,
+        **{k: v for k, v in optional.items() if v}
     }
     
-    # Add optional parameters
-    if warehouse:
-        connection_params['warehouse'] = warehouse
-    if database:
-        connection_params['database'] = database
-    if schema:
-        connection_params['schema'] = schema
-    if role:
-        connection_params['role'] = role
-    
     # Test authentication
-    auth_result = auth_client.test_authentication(connection_params)
+    auth_result = await asyncio.to_thread(auth_client.test_authentication, connection_params)
     
     if not auth_result.get('valid', False):
         return {
@@ -187,14 +582,17 @@ async def authenticate_snowflake(
     # Set credentials
     auth_client.set_credentials(connection_params)
     
-    # Save if requested
-    if save_credentials:
-        auth_client.storage.save_credentials(account, user, connection_params)
-    
-    # Create and initialize database connection
+    # Create and initialize database connection; the login runs in the
+    # background while the credentials are saved
     db = SnowflakeDB(connection_params)
+    _invalidate_metadata()
     await db.start_init_connection()
     
+    # Save if requested
+    if save_credentials:
+        await asyncio.to_thread(auth_client.storage.save_credentials, account, user, connection_params)
+        _invalidate_saved_credentials()
+    
     return {
         'success': True,
         'authenticated': True,
@@ -215,7 +613,7 @@ async def use_saved_credentials(
     """
     global db
     
-    connection_params = auth_client.storage.get_credentials(account, user)
+    connection_params = await asyncio.to_thread(auth_client.storage.get_credentials, account, user)
     
     if not connection_params:
         return {
@@ -224,13 +622,14 @@ async def use_saved_credentials(
         }
     
     # Test that credentials still work
-    auth_result = auth_client.test_authentication(connection_params)
+    auth_result = await asyncio.to_thread(auth_client.test_authentication, connection_params)
     
     if auth_result['valid']:
         auth_client.set_credentials(connection_params)
         
         # Create and initialize database connection
         db = SnowflakeDB(connection_params)
+        _invalidate_metadata()
         await db.start_init_connection()
         
         return {
@@ -246,7 +645,7 @@ async def use_saved_credentials(
 @mcp.tool()
 async def list_saved_credentials() -> Dict[str, Any]:
     """List all saved Snowflake credentials."""
-    saved = auth_client.storage.list_saved_credentials()
+    saved = await _list_saved_credentials()
     
     if not saved:
         return {
@@ -272,7 +671,8 @@ async def delete_saved_credentials(
         account: Account to delete (optional, deletes all if not specified)
         user: User to delete (optional)
     """
-    auth_client.storage.delete_credentials(account, user)
+    await asyncio.to_thread(auth_client.delete_credentials, account, user)
+    _invalidate_saved_credentials()
     
     if not account and not user:
         message = 'All saved credentials have been deleted.'
@@ -290,30 +690,24 @@ async def delete_saved_credentials(
 
 # Database tools
 @mcp.tool()
+@_require_auth
+@_cache_metadata
+@_catch_errors
 async def list_databases() -> Dict[str, Any]:
     """List all available databases in Snowflake."""
-    if not db:
-        return {
-            'success': False,
-            'error': 'Not authenticated. Please use authenticate_snowflake first.'
-        }
+    query = "SELECT DATABASE_NAME FROM INFORMATION_SCHEMA.DATABASES ORDER BY DATABASE_NAME"
+    data, data_id = await db.execute_query(query)
     
-    try:
-        query = "SELECT DATABASE_NAME FROM INFORMATION_SCHEMA.DATABASES ORDER BY DATABASE_NAME"
-        data, data_id = await db.execute_query(query)
-        
-        return {
-            'success': True,
-            'databases': [row['DATABASE_NAME'] for row in data],
-            'count': len(data)
-        }
-    except Exception as e:
-        return {
-            'success': False,
-            'error': str(e)
-        }
+    return {
+        'success': True,
+        'databases': [row['DATABASE_NAME'] for row in data],
+        'count': len(data)
+    }
 
 @mcp.tool()
+@_require_auth
+@_cache_metadata
+@_catch_errors
 async def list_schemas(database: str) -> Dict[str, Any]:
     """
     List all schemas in a database.
@@ -321,37 +715,40 @@ async def list_schemas(database: str) -> Dict[str, Any]:
     Args:
         database: Database name
     """
-    if not db:
-        return {
-            'success': False,
-            'error': 'Not authenticated. Please use authenticate_snowflake first.'
-        }
-    
     # Check for placeholder values
-    if '<' in database or '>' in database or 'placeholder' in database.lower():
+    if _NAME_PLACEHOLDER_RE.search(database):
         return {
             'success': False,
             'error': f'Database name contains placeholder value: "{database}". Please use an actual database name from list_databases.',
             'hint': 'First use list_databases to get available databases, then use one of those names.'
         }
     
-    try:
-        query = f"SELECT SCHEMA_NAME FROM {database.upper()}.INFORMATION_SCHEMA.SCHEMATA ORDER BY SCHEMA_NAME"
-        data, data_id = await db.execute_query(query)
-        
-        return {
-            'success': True,
-            'database': database,
-            'schemas': [row['SCHEMA_NAME'] for row in data],
-            'count': len(data)
-        }
-    except Exception as e:
+    if not _IDENTIFIER_RE.match(database.upper()):
         return {
             'success': False,
-            'error': str(e)
+            'error': f'Invalid database name: "{database}"'
         }
+    
+    # SHOW is answered from metadata without a warehouse and is much faster
+    # than INFORMATION_SCHEMA; its output is capped, so a full page falls back
+    data, data_id = await db.execute_query(f"SHOW TERSE SCHEMAS IN DATABASE {database.upper()}")
+    schemas = [row['name'] for row in data]
+    if len(schemas) >= _SHOW_ROW_LIMIT:
+        query = f"SELECT SCHEMA_NAME FROM {database.upper()}.INFORMATION_SCHEMA.SCHEMATA ORDER BY SCHEMA_NAME"
+        data, data_id = await db.execute_query(query)
+        schemas = [row['SCHEMA_NAME'] for row in data]
+    
+    return {
+        'success': True,
+        'database': database,
+        'schemas': schemas,
+        'count': len(schemas)
+    }
 
 @mcp.tool()
+@_require_auth
+@_cache_metadata
+@_catch_errors
 async def list_tables(database: str, schema: str) -> Dict[str, Any]:
     """
     List all tables in a specific database and schema.
@@ -360,140 +757,202 @@ async def list_tables(database: str, schema: str) -> Dict[str, Any]:
         database: Database name
         schema: Schema name
     """
-    if not db:
-        return {
-            'success': False,
-            'error': 'Not authenticated. Please use authenticate_snowflake first.'
-        }
-    
     # Check for placeholder values
-    if '<' in database or '>' in database or 'placeholder' in database.lower():
+    if _NAME_PLACEHOLDER_RE.search(database):
         return {
             'success': False,
             'error': f'Database name contains placeholder value: "{database}". Please use an actual database name from list_databases.',
             'hint': 'First use list_databases to get available databases, then use one of those names.'
         }
     
-    if '<' in schema or '>' in schema or 'placeholder' in schema.lower():
+    if _NAME_PLACEHOLDER_RE.search(schema):
         return {
             'success': False,
             'error': f'Schema name contains placeholder value: "{schema}". Please use an actual schema name from list_schemas.',
             'hint': f'First use list_schemas with database "{database}" to get available schemas, then use one of those names.'
         }
     
-    try:
-        query = f"""
-            SELECT TABLE_NAME, TABLE_TYPE, ROW_COUNT, BYTES, COMMENT 
-            FROM {database.upper()}.INFORMATION_SCHEMA.TABLES 
-            WHERE TABLE_SCHEMA = '{schema.upper()}'
-            ORDER BY TABLE_NAME
-        """
-        data, data_id = await db.execute_query(query)
-        
-        tables = []
-        for row in data:
-            tables.append({
-                'name': row['TABLE_NAME'],
-                'type': row['TABLE_TYPE'],
-                'row_count': row.get('ROW_COUNT'),
-                'bytes': row.get('BYTES'),
-                'comment': row.get('COMMENT', '')
-            })
-        
-        return {
-            'success': True,
-            'database': database,
-            'schema': schema,
-            'tables': tables,
-            'count': len(tables)
-        }
-    except Exception as e:
+    if not _IDENTIFIER_RE.match(database.upper()):
         return {
             'success': False,
-            'error': str(e)
+            'error': f'Invalid database name: "{database}"'
         }
+    
+    data, data_id = await db.execute_query(
+        _LIST_TABLES_SQL, [_info_schema(database.upper(), "TABLES"), schema.upper()]
+    )
+    
+    tables = [dict(zip(_TABLE_KEYS, _TABLE_FIELDS(row))) for row in data]
+    
+    return {
+        'success': True,
+        'database': database,
+        'schema': schema,
+        'tables': tables,
+        'count': len(tables)
+    }
+
+# batch_describe limits: schemas per call, and how many of them are queried at
+# once (the query executor has SnowflakeDB.MAX_CONCURRENT_QUERIES workers)
+_BATCH_DESCRIBE_MAX_SCHEMAS = 50
+_BATCH_DESCRIBE_CONCURRENCY = 4
 
 @mcp.tool()
-async def describe_table(table_name: str) -> Dict[str, Any]:
+@_require_auth
+async def batch_describe(database: str, schemas: List[str]) -> Dict[str, Any]:
     """
-    Get the schema information for a specific table.
-    
+    Describe every table in several schemas of a database at once.
+
+    The schemas are queried concurrently, so this is much faster than calling
+    list_tables and describe_table for each one.
+
     Args:
-        table_name: Fully qualified table name (database.schema.table)
+        database: Database name
+        schemas: Schema names to describe (at most 50)
     """
-    if not db:
+    if _NAME_PLACEHOLDER_RE.search(database):
         return {
             'success': False,
-            'error': 'Not authenticated. Please use authenticate_snowflake first.'
+            'error': f'Database name contains placeholder value: "{database}". Please use an actual database name from list_databases.',
+            'hint': 'First use list_databases to get available databases, then use one of those names.'
         }
-    
-    # Check for placeholder values
-    if '<' in table_name or '>' in table_name or 'placeholder' in table_name.lower():
+
+    if not _IDENTIFIER_RE.match(database.upper()):
         return {
             'success': False,
-            'error': f'Table name contains placeholder value: "{table_name}". Please use an actual table name from list_tables or search_tables.',
-            'hint': 'First use list_tables or search_tables to find actual table names, then use the fully qualified name (database.schema.table).'
+            'error': f'Invalid database name: "{database}"'
         }
-    
-    try:
-        parts = table_name.split('.')
-        if len(parts) != 3:
+
+    if len(schemas) > _BATCH_DESCRIBE_MAX_SCHEMAS:
+        return {
+            'success': False,
+            'error': f'Too many schemas ({len(schemas)}); describe at most {_BATCH_DESCRIBE_MAX_SCHEMAS} per call.'
+        }
+
+    for schema in schemas:
+        if _NAME_PLACEHOLDER_RE.search(schema):
             return {
                 'success': False,
-                'error': 'Table name must be fully qualified as database.schema.table'
+                'error': f'Schema name contains placeholder value: "{schema}". Please use an actual schema name from list_schemas.',
+                'hint': f'First use list_schemas with database "{database}" to get available schemas, then use one of those names.'
             }
-        
-        database, schema, table = parts
-        
-        query = f"""
-            SELECT COLUMN_NAME, DATA_TYPE, IS_NULLABLE, COLUMN_DEFAULT, COMMENT
-            FROM {database.upper()}.INFORMATION_SCHEMA.COLUMNS
-            WHERE TABLE_SCHEMA = '{schema.upper()}'
-            AND TABLE_NAME = '{table.upper()}'
-            ORDER BY ORDINAL_POSITION
-        """
-        data, data_id = await db.execute_query(query)
-        
-        columns = []
-        for row in data:
-            columns.append({
+        if not _IDENTIFIER_RE.match(schema.upper()):
+            return {
+                'success': False,
+                'error': f'Invalid schema name: "{schema}"'
+            }
+
+    columns_view = _info_schema(database.upper(), "COLUMNS")
+    # Leave executor workers free for other tools while the schemas are queried
+    limit = asyncio.Semaphore(_BATCH_DESCRIBE_CONCURRENCY)
+
+    async def describe_schema(schema: str):
+        async with limit:
+            return await db.execute_query(_SCHEMA_COLUMNS_SQL, [columns_view, schema.upper()])
+
+    results = await asyncio.gather(*map(describe_schema, schemas), return_exceptions=True)
+
+    described = {}
+    errors = {}
+    for schema, result in zip(schemas, results):
+        if isinstance(result, Exception):
+            errors[schema] = str(result)
+            continue
+        tables: Dict[str, List[Dict[str, Any]]] = {}
+        for row in result[0]:
+            tables.setdefault(row['TABLE_NAME'], []).append({
                 'name': row['COLUMN_NAME'],
                 'type': row['DATA_TYPE'],
-                'nullable': row['IS_NULLABLE'] == 'YES',
-                'default': row.get('COLUMN_DEFAULT'),
-                'comment': row.get('COMMENT', '')
+                'nullable': _IS_NULLABLE.get(row['IS_NULLABLE'], False),
+                'default': row['COLUMN_DEFAULT'],
+                'comment': row['COMMENT']
             })
-        
-        return {
-            'success': True,
-            'table': table_name,
-            'columns': columns,
-            'column_count': len(columns)
-        }
-    except Exception as e:
+        described[schema] = tables
+
+    response = {
+        'success': bool(described) or not schemas,
+        'database': database,
+        'schemas': described,
+        'table_count': sum(len(tables) for tables in described.values())
+    }
+    if errors:
+        response['errors'] = errors
+    return response
+
+@mcp.tool()
+@_require_auth
+@_cache_metadata
+@_catch_errors
+async def describe_table(table_name: str, refresh: bool = False) -> Dict[str, Any]:
+    """
+    Get the schema information for a specific table.
+    
+    Args:
+        table_name: Fully qualified table name (database.schema.table)
+        refresh: Bypass the cached column listing
+    """
+    # Validate the name and reject placeholders in one match
+    m = _FQN_RE.match(table_name)
+    if not m:
+        if _NAME_PLACEHOLDER_RE.search(table_name):
+            return _placeholder_table_error(table_name)
         return {
             'success': False,
-            'error': str(e)
+            'error': 'Table name must be fully qualified as database.schema.table'
+        }
+    
+    database, schema, table = (g.upper() for g in m.groups())
+    
+    data, data_id = await db.execute_query(
+        _DESCRIBE_TABLE_SQL, [_info_schema(database, "COLUMNS"), schema, table]
+    )
+    
+    columns = [
+        {
+            'name': name,
+            'type': data_type,
+            'nullable': _IS_NULLABLE.get(nullable, False),
+            'default': default,
+            'comment': comment
         }
+        for name, data_type, nullable, default, comment in map(_COLUMN_FIELDS, data)
+    ]
+    
+    return {
+        'success': True,
+        'table': table_name,
+        'columns': columns,
+        'column_count': len(columns)
+    }
 
 @mcp.tool()
-async def read_query(query: str) -> Dict[str, Any]:
+@_require_auth
+@_catch_errors
+async def read_query(
+    query: str,
+    params: Optional[List[Any]] = None,
+    max_rows: int = 1000
+) -> Dict[str, Any]:
     """
     Execute a SELECT query on Snowflake.
     
+    Only the first max_rows rows are returned; when the result is larger,
+    'truncated' is true and the remaining rows can be paged with fetch_rows
+    using the returned data_id.
+    
     Args:
         query: SELECT SQL query to execute
+        params: Optional values bound to ? placeholders in the query
+        max_rows: Maximum number of rows to return (default: 1000)
     """
-    if not db:
+    if max_rows < 1:
         return {
             'success': False,
-            'error': 'Not authenticated. Please use authenticate_snowflake first.'
+            'error': 'max_rows must be at least 1.'
         }
     
     # Check for placeholder values
-    placeholders = ["<database>", "<schema>", "<table", "placeholder", "PLACEHOLDER", 
-                   "<orders_table>", "<customers_table>", "<sales_table>"]
-    if any(placeholder in query for placeholder in placeholders):
+    if _QUERY_PLACEHOLDER_RE.search(query):
         return {
             'success': False,
             'error': 'SQL query contains placeholder values. Please use actual table names discovered from search_tables or list_tables tools.',
@@ -502,28 +961,91 @@ async def read_query(query: str) -> Dict[str, Any]:
         }
     
     # Check if it's a read query
-    if write_detector.analyze_query(query)['contains_write']:
+    if _contains_write(query):
         return {
             'success': False,
             'error': 'Only SELECT queries are allowed. Use write_query for INSERT/UPDATE/DELETE operations.'
         }
     
-    try:
-        data, data_id = await db.execute_query(query)
-        
-        return {
-            'success': True,
-            'data': data,
-            'row_count': len(data),
-            'data_id': data_id
-        }
-    except Exception as e:
+    data, truncated, data_id = await db.execute_query_preview(query, params, max_rows)
+    _remember_result(data_id)
+    
+    result = {
+        'success': True,
+        'data': data,
+        'row_count': len(data),
+        'truncated': truncated,
+        'data_id': data_id
+    }
+    if truncated:
+        result['hint'] = f'Result has more than {max_rows} rows. Use fetch_rows with this data_id to page through the rest.'
+    return result
+
+# read_query results that fetch_rows may page, as data_id -> the
+# SnowflakeDB that ran them; RESULT_SCAN only sees the same session's queries
+_RESULTS: Dict[str, Any] = {}
+_RESULTS_MAX = 256
+
+def _remember_result(data_id: str):
+    """Record a pageable result, forgetting the oldest past _RESULTS_MAX"""
+    _RESULTS.pop(data_id, None)
+    _RESULTS[data_id] = db
+    if len(_RESULTS) > _RESULTS_MAX:
+        _RESULTS.pop(next(iter(_RESULTS)))
+
+def _expired_result_error(data_id: str, detail: Optional[str] = None) -> Dict[str, Any]:
+    """Error result for a data_id that can no longer be paged"""
+    result = {
+        'success': False,
+        'error': f'Result expired or unknown data_id "{data_id}". Run the query again with read_query.'
+    }
+    if detail:
+        result['details'] = detail
+    return result
+
+@mcp.tool()
+@_require_auth
+@_catch_errors
+async def fetch_rows(data_id: str, offset: int = 0, limit: int = 1000) -> Dict[str, Any]:
+    """
+    Fetch a page of rows from an earlier read_query result.
+    
+    Paging is best-effort: RESULT_SCAN has no ORDER BY, so Snowflake does not
+    guarantee that pages are stable or disjoint. A data_id stops working after
+    re-authenticating or once Snowflake drops the result (24 hours).
+    
+    Args:
+        data_id: data_id returned by read_query
+        offset: Number of rows to skip (default: 0)
+        limit: Maximum number of rows to return (default: 1000)
+    """
+    if limit < 1 or offset < 0:
         return {
             'success': False,
-            'error': str(e)
+            'error': 'limit must be at least 1 and offset must not be negative.'
         }
+    if _RESULTS.get(data_id) is not db:
+        return _expired_result_error(data_id)
+    
+    # LIMIT/OFFSET are formatted from ints; the query id itself is bound
+    query = f"SELECT * FROM TABLE(RESULT_SCAN(?)) LIMIT {int(limit)} OFFSET {int(offset)}"
+    try:
+        data, _ = await db.execute_query(query, [data_id])
+    except Exception as e:
+        _RESULTS.pop(data_id, None)
+        return _expired_result_error(data_id, str(e))
+    
+    return {
+        'success': True,
+        'data': data,
+        'row_count': len(data),
+        'offset': offset,
+        'data_id': data_id
+    }
 
 @mcp.tool()
+@_require_auth
+@_catch_errors
 async def write_query(query: str) -> Dict[str, Any]:
     """
     Execute an INSERT, UPDATE, or DELETE query on Snowflake.
@@ -531,22 +1053,14 @@ async def write_query(query: str) -> Dict[str, Any]:
     Args:
         query: SQL query to execute
     """
-    if not config.get("allow_write", False):
+    if not _ALLOW_WRITE:
         return {
             'success': False,
             'error': 'Write operations are not allowed. Start the server with allow_write=true to enable.'
         }
     
-    if not db:
-        return {
-            'success': False,
-            'error': 'Not authenticated. Please use authenticate_snowflake first.'
-        }
-    
     # Check for placeholder values
-    placeholders = ["<database>", "<schema>", "<table", "placeholder", "PLACEHOLDER", 
-                   "<orders_table>", "<customers_table>", "<sales_table>"]
-    if any(placeholder in query for placeholder in placeholders):
+    if _QUERY_PLACEHOLDER_RE.search(query):
         return {
             'success': False,
             'error': 'SQL query contains placeholder values. Please use actual table names discovered from search_tables or list_tables tools.',
@@ -555,25 +1069,20 @@ async def write_query(query: str) -> Dict[str, Any]:
         }
     
     # Check if it's a write query
-    if not write_detector.analyze_query(query)['contains_write']:
+    if not _contains_write(query):
         return {
             'success': False,
             'error': 'Only INSERT, UPDATE, or DELETE queries are allowed here. Use read_query for SELECT operations.'
         }
     
-    try:
-        data, data_id = await db.execute_query(query)
-        
-        return {
-            'success': True,
-            'message': 'Query executed successfully',
-            'data_id': data_id
-        }
-    except Exception as e:
-        return {
-            'success': False,
-            'error': str(e)
-        }
+    data, data_id = await db.execute_query(query)
+    _invalidate_metadata(query)
+    
+    return {
+        'success': True,
+        'message': 'Query executed successfully',
+        'data_id': data_id
+    }
 
 # Data insights resource
 @mcp.resource("memo://insights")
@@ -584,6 +1093,7 @@ async def get_insights() -> str:
     return db.get_memo()
 
 @mcp.tool()
+@_require_auth
 async def append_insight(insight: str) -> Dict[str, Any]:
     """
     Add a data insight to the memo.
@@ -591,12 +1101,6 @@ async def append_insight(insight: str) -> Dict[str, Any]:
     Args:
         insight: Data insight discovered from analysis
     """
-    if not db:
-        return {
-            'success': False,
-            'error': 'Not authenticated. Please use authenticate_snowflake first.'
-        }
-    
     db.add_insight(insight)
     
     return {
@@ -605,6 +1109,8 @@ async def append_insight(insight: str) -> Dict[str, Any]:
     }
 
 @mcp.tool()
+@_require_auth
+@_catch_errors
 async def profile_table(table_name: str) -> Dict[str, Any]:
     """
     Get statistical profile of a table including row count, column statistics, and sample values.
@@ -612,126 +1118,74 @@ async def profile_table(table_name: str) -> Dict[str, Any]:
     Args:
         table_name: Fully qualified table name (database.schema.table)
     """
-    if not db:
+    # Validate the name and reject placeholders in one match
+    m = _FQN_RE.match(table_name)
+    if not m:
+        if _NAME_PLACEHOLDER_RE.search(table_name):
+            return _placeholder_table_error(table_name)
         return {
             'success': False,
-            'error': 'Not authenticated. Please use authenticate_snowflake first.'
+            'error': f"Table name must be fully qualified as database.schema.table, got: {table_name}"
         }
     
-    # Check for placeholder values
-    if '<' in table_name or '>' in table_name or 'placeholder' in table_name.lower():
-        return {
-            'success': False,
-            'error': f'Table name contains placeholder value: "{table_name}". Please use an actual table name from list_tables or search_tables.',
-            'hint': 'First use list_tables or search_tables to find actual table names, then use the fully qualified name (database.schema.table).'
-        }
-    
-    try:
-        # Basic table info query
-        row_count_query = f"SELECT COUNT(*) as row_count FROM {table_name}"
-        row_count_result, _ = await db.execute_query(row_count_query)
-        row_count = row_count_result[0]["ROW_COUNT"] if row_count_result else 0
-        
-            
-        # Get column information with statistics
-        # Parse the table name to get database, schema, and table parts
-        parts = table_name.split('.')
-        if len(parts) != 3:
-            raise ValueError(f"Table name must be fully qualified as database.schema.table, got: {table_name}")
-        
-        db_name, schema_name, table = parts
-        
-        profile_query = f"""
-        SELECT 
-            COLUMN_NAME,
-            DATA_TYPE,
-            IS_NULLABLE,
-            COLUMN_DEFAULT,
-            COMMENT
-        FROM {db_name.upper()}.INFORMATION_SCHEMA.COLUMNS
-        WHERE TABLE_NAME = '{table.upper()}'
-        AND TABLE_SCHEMA = '{schema_name.upper()}'
-        AND TABLE_CATALOG = '{db_name.upper()}'
-        """
-        
-        columns_info, _ = await db.execute_query(profile_query)
-        
-        # Get statistics for each column
-        column_stats = []
-        for col in columns_info:
-            col_name = col["COLUMN_NAME"]
-            stats = {
-                "column_name": col_name,
-                "data_type": col["DATA_TYPE"],
-                "nullable": col["IS_NULLABLE"] == "YES",
-                "default": col["COLUMN_DEFAULT"],
-                "comment": col["COMMENT"]
-            }
-            
-            # Get additional statistics based on data type
-            if "NUMBER" in col["DATA_TYPE"] or "INT" in col["DATA_TYPE"] or "FLOAT" in col["DATA_TYPE"]:
-                # Numeric column statistics
-                stats_query = f"""
-                SELECT 
-                    MIN({col_name}) as min_value,
-                    MAX({col_name}) as max_value,
-                    AVG({col_name}) as avg_value,
-                    MEDIAN({col_name}) as median_value,
-                    COUNT(DISTINCT {col_name}) as distinct_count,
-                    COUNT(CASE WHEN {col_name} IS NULL THEN 1 END) as null_count
-                FROM {table_name}
-                """
-                stats_result, _ = await db.execute_query(stats_query)
-                if stats_result:
-                    stats.update({
-                        "min": stats_result[0]["MIN_VALUE"],
-                        "max": stats_result[0]["MAX_VALUE"],
-                        "avg": stats_result[0]["AVG_VALUE"],
-                        "median": stats_result[0]["MEDIAN_VALUE"],
-                        "distinct_count": stats_result[0]["DISTINCT_COUNT"],
-                        "null_count": stats_result[0]["NULL_COUNT"],
-                        "null_percentage": (stats_result[0]["NULL_COUNT"] / row_count * 100) if row_count > 0 else 0
-                    })
-            else:
-                # String/other column statistics
-                stats_query = f"""
-                SELECT 
-                    COUNT(DISTINCT {col_name}) as distinct_count,
-                    COUNT(CASE WHEN {col_name} IS NULL THEN 1 END) as null_count,
-                    MIN(LENGTH({col_name})) as min_length,
-                    MAX(LENGTH({col_name})) as max_length,
-                    AVG(LENGTH({col_name})) as avg_length
-                FROM {table_name}
-                """
-                stats_result, _ = await db.execute_query(stats_query)
-                if stats_result:
-                    stats.update({
-                        "distinct_count": stats_result[0]["DISTINCT_COUNT"],
-                        "null_count": stats_result[0]["NULL_COUNT"],
-                        "null_percentage": (stats_result[0]["NULL_COUNT"] / row_count * 100) if row_count > 0 else 0,
-                        "min_length": stats_result[0]["MIN_LENGTH"],
-                        "max_length": stats_result[0]["MAX_LENGTH"],
-                        "avg_length": stats_result[0]["AVG_LENGTH"]
-                    })
-            
-            column_stats.append(stats)
-        
-        
-        return {
-            'success': True,
-            'table_name': table_name,
-            'row_count': row_count,
-            'column_count': len(columns_info),
-            'columns': column_stats
-        }
+    # Get column information with statistics
+    db_name, schema_name, table = (g.upper() for g in m.groups())
+    
+    columns_info, _ = await db.execute_query(
+        _PROFILE_COLUMNS_SQL, [_info_schema(db_name, "COLUMNS"), table, schema_name, db_name]
+    )
+    
+    # Compute the row count and statistics for every column in a single scan of the table
+    column_templates = [
+        _NUMERIC_STATS if _is_numeric_type(col["DATA_TYPE"]) else _TEXT_STATS
+        for col in columns_info
+    ]
+    stats_query = _build_stats_sql(table_name, tuple(
+        (col["COLUMN_NAME"], templates is _NUMERIC_STATS)
+        for col, templates in zip(columns_info, column_templates)
+    ))
+    stats_result, _ = await db.execute_query(stats_query)
+    stats_row = stats_result[0] if stats_result else {}
+    row_count = stats_row.get("ROW_COUNT", 0)
+    
+    # Slice the single result row back into per-column statistics
+    column_stats = []
+    for i, (col, templates) in enumerate(zip(columns_info, column_templates)):
+        name, data_type, nullable, default, comment = _COLUMN_FIELDS(col)
+        if not stats_row:
+            column_stats.append({
+                "column_name": name,
+                "data_type": data_type,
+                "nullable": _IS_NULLABLE.get(nullable, False),
+                "default": default,
+                "comment": comment
+            })
+            continue
         
-    except Exception as e:
-        return {
-            'success': False,
-            'error': str(e)
-        }
+        null_count = stats_row[f"C{i}_NULL_COUNT"]
+        column_stats.append({
+            "column_name": name,
+            "data_type": data_type,
+            "nullable": _IS_NULLABLE.get(nullable, False),
+            "default": default,
+            "comment": comment,
+            **{field: stats_row[f"C{i}_{field.upper()}"] for field, _ in templates},
+            "null_percentage": (null_count / row_count * 100) if row_count > 0 else 0
+        })
+    
+    
+    return {
+        'success': True,
+        'table_name': table_name,
+        'row_count': row_count,
+        'column_count': len(columns_info),
+        'columns': column_stats
+    }
+    
 
 @mcp.tool()
+@_require_auth
+@_catch_errors
 async def get_sample_data(
     table_name: str,
     sample_size: int = 10,
@@ -747,82 +1201,75 @@ async def get_sample_data(
         sample_method: Sampling method: 'top', 'random', or 'bottom' (default: 'top')
         columns: Optional list of columns to include
     """
-    if not db:
-        return {
-            'success': False,
-            'error': 'Not authenticated. Please use authenticate_snowflake first.'
-        }
-    
     # Check for placeholder values
-    if '<' in table_name or '>' in table_name or 'placeholder' in table_name.lower():
-        return {
-            'success': False,
-            'error': f'Table name contains placeholder value: "{table_name}". Please use an actual table name from list_tables or search_tables.',
-            'hint': 'First use list_tables or search_tables to find actual table names, then use the fully qualified name (database.schema.table).'
-        }
+    if _NAME_PLACEHOLDER_RE.search(table_name):
+        return _placeholder_table_error(table_name)
     
-    try:
-            
-        # Build column list
-        column_list = ", ".join(columns) if columns else "*"
         
-        # Build query based on sample method
-        if sample_method == "random":
-            query = f"""
-            SELECT {column_list}
-            FROM {table_name}
-            SAMPLE ({sample_size} ROWS)
-            """
-        elif sample_method == "bottom":
-            query = f"""
-            SELECT {column_list}
-            FROM (
-                SELECT *
-                FROM {table_name}
-                ORDER BY 1 DESC
-                LIMIT {sample_size}
-            )
-            ORDER BY 1
-            """
-        else:  # default to "top"
-            query = f"""
-            SELECT {column_list}
+    # Build column list
+    column_list = ", ".join(columns) if columns else "*"
+    
+    # Build query based on sample method
+    if sample_method == "random":
+        query = f"""
+        SELECT {column_list}
+        FROM {table_name}
+        SAMPLE ({sample_size} ROWS)
+        """
+    elif sample_method == "bottom":
+        query = f"""
+        SELECT {column_list}
+        FROM (
+            SELECT *
             FROM {table_name}
+            ORDER BY 1 DESC
             LIMIT {sample_size}
-            """
-        
-        # Execute query
-        sample_data, data_id = await db.execute_query(query)
-        
-        # Also get total row count for context
-        count_query = f"SELECT COUNT(*) as total_rows FROM {table_name}"
-        count_result, _ = await db.execute_query(count_query)
-        total_rows = count_result[0]["TOTAL_ROWS"] if count_result else 0
-        
-        
-        return {
-            'success': True,
-            'table_name': table_name,
-            'total_rows': total_rows,
-            'sample_size': len(sample_data),
-            'sample_method': sample_method,
-            'columns': columns if columns else "all",
-            'data': sample_data,
-            'data_id': data_id
-        }
-        
-    except Exception as e:
-        return {
-            'success': False,
-            'error': str(e)
-        }
+        )
+        ORDER BY 1
+        """
+    else:  # default to "top"
+        query = f"""
+        SELECT {column_list}
+        FROM {table_name}
+        LIMIT {sample_size}
+        """
+    
+    # Also get total row count for context. A bare COUNT(*) is answered from
+    # table metadata, so it runs alongside the sample instead of after it.
+    count_query = f"SELECT COUNT(*) as total_rows FROM {table_name}"
+    (sample_data, data_id), (count_result, _) = await asyncio.gather(
+        db.execute_query(query), db.execute_query(count_query)
+    )
+    total_rows = count_result[0]["TOTAL_ROWS"] if count_result else 0
+    
+    
+    return {
+        'success': True,
+        'table_name': table_name,
+        'total_rows': total_rows,
+        'sample_size': len(sample_data),
+        'sample_method': sample_method,
+        'columns': columns if columns else "all",
+        'data': sample_data,
+        'data_id': data_id
+    }
+    
+
+# Most tables search_tables returns per page
+_SEARCH_TABLES_MAX_LIMIT = 1000
 
 @mcp.tool()
+@_require_auth
+@_cache_metadata
+@_catch_errors
 async def search_tables(
     search_pattern: str,
     search_type: str = "table_name",
     database: Optional[str] = None,
-    schema: Optional[str] = None
+    schema: Optional[str] = None,
+    limit: int = 200,
+    offset: int = 0,
+    refresh: bool = False
 ) -> Dict[str, Any]:
     """
     Search for tables by name pattern, column name, or comment.
@@ -832,250 +1279,259 @@ async def search_tables(
         search_type: Type of search: 'table_name', 'column_name', or 'comment'
         database: Optional database name to limit search
         schema: Optional schema name to limit search
+        limit: Maximum number of tables to return, at most 1000 (default: 200)
+        offset: Number of matching tables to skip, for paging (default: 0)
+        refresh: Bypass the short-lived metadata cache (default: false)
     """
-    if not db:
+    if not 1 <= limit <= _SEARCH_TABLES_MAX_LIMIT or offset < 0:
         return {
             'success': False,
-            'error': 'Not authenticated. Please use authenticate_snowflake first.'
+            'error': f'limit must be between 1 and {_SEARCH_TABLES_MAX_LIMIT} and offset must not be negative.'
         }
     
-    try:
-        # Build the base query based on search type
-        if search_type == "column_name":
-            # Search for tables containing a specific column
-            query = f"""
-            SELECT DISTINCT 
-                c.TABLE_CATALOG as DATABASE_NAME,
-                c.TABLE_SCHEMA as SCHEMA_NAME,
-                c.TABLE_NAME,
-                t.COMMENT as TABLE_COMMENT,
-                t.ROW_COUNT,
-                t.BYTES,
-                ARRAY_AGG(c.COLUMN_NAME) as MATCHING_COLUMNS
-            FROM INFORMATION_SCHEMA.COLUMNS c
-            JOIN INFORMATION_SCHEMA.TABLES t 
-                ON c.TABLE_CATALOG = t.TABLE_CATALOG 
-                AND c.TABLE_SCHEMA = t.TABLE_SCHEMA 
-                AND c.TABLE_NAME = t.TABLE_NAME
-            WHERE UPPER(c.COLUMN_NAME) LIKE UPPER('%{search_pattern}%')
-            """
-        elif search_type == "comment":
-            # Search in table comments
-            query = f"""
-            SELECT 
-                TABLE_CATALOG as DATABASE_NAME,
-                TABLE_SCHEMA as SCHEMA_NAME,
-                TABLE_NAME,
-                COMMENT as TABLE_COMMENT,
-                ROW_COUNT,
-                BYTES
-            FROM INFORMATION_SCHEMA.TABLES
-            WHERE UPPER(COMMENT) LIKE UPPER('%{search_pattern}%')
-            """
-        else:  # default to table_name search
-            query = f"""
-            SELECT 
-                TABLE_CATALOG as DATABASE_NAME,
-                TABLE_SCHEMA as SCHEMA_NAME,
-                TABLE_NAME,
-                COMMENT as TABLE_COMMENT,
-                ROW_COUNT,
-                BYTES
-            FROM INFORMATION_SCHEMA.TABLES
-            WHERE UPPER(TABLE_NAME) LIKE UPPER('%{search_pattern}%')
-            """
-        
-        # Add database filter if provided
-        if database:
-            query += f"\nAND TABLE_CATALOG = '{database}'"
-        
-        # Add schema filter if provided
-        if schema:
-            query += f"\nAND TABLE_SCHEMA = '{schema}'"
-        
-        # Add grouping for column search
-        if search_type == "column_name":
-            query += "\nGROUP BY c.TABLE_CATALOG, c.TABLE_SCHEMA, c.TABLE_NAME, t.COMMENT, t.ROW_COUNT, t.BYTES"
-        
-        # Add ordering
-        query += "\nORDER BY DATABASE_NAME, SCHEMA_NAME, TABLE_NAME"
-        
-        # Execute the search
-        results, _ = await db.execute_query(query)
-        
-        # Format results
-        formatted_results = []
-        for row in results:
-            result = {
-                "database": row["DATABASE_NAME"],
-                "schema": row["SCHEMA_NAME"],
-                "table": row["TABLE_NAME"],
-                "full_name": f"{row['DATABASE_NAME']}.{row['SCHEMA_NAME']}.{row['TABLE_NAME']}",
-                "comment": row.get("TABLE_COMMENT", ""),
-                "row_count": row.get("ROW_COUNT", 0),
-                "size_bytes": row.get("BYTES", 0)
-            }
-            
-            # Add matching columns for column search
-            if search_type == "column_name" and "MATCHING_COLUMNS" in row:
-                result["matching_columns"] = row["MATCHING_COLUMNS"]
-            
-            formatted_results.append(result)
-        
-        return {
-            'success': True,
-            'search_pattern': search_pattern,
-            'search_type': search_type,
-            'database_filter': database,
-            'schema_filter': schema,
-            'results_count': len(formatted_results),
-            'results': formatted_results
-        }
-        
-    except Exception as e:
-        return {
-            'success': False,
-            'error': str(e)
+    # Build the base query based on search type
+    if search_type == "column_name":
+        # Search for tables containing a specific column
+        query = """
+        SELECT 
+            c.TABLE_CATALOG as DATABASE_NAME,
+            c.TABLE_SCHEMA as SCHEMA_NAME,
+            c.TABLE_NAME,
+            ANY_VALUE(t.COMMENT) as TABLE_COMMENT,
+            ANY_VALUE(t.ROW_COUNT) as ROW_COUNT,
+            ANY_VALUE(t.BYTES) as BYTES,
+            ARRAY_AGG(DISTINCT c.COLUMN_NAME) WITHIN GROUP (ORDER BY c.COLUMN_NAME) as MATCHING_COLUMNS
+        FROM INFORMATION_SCHEMA.COLUMNS c
+        JOIN INFORMATION_SCHEMA.TABLES t 
+            ON c.TABLE_CATALOG = t.TABLE_CATALOG 
+            AND c.TABLE_SCHEMA = t.TABLE_SCHEMA 
+            AND c.TABLE_NAME = t.TABLE_NAME
+        WHERE UPPER(c.COLUMN_NAME) LIKE UPPER('%' || ? || '%')
+        """
+    elif search_type == "comment":
+        # Search in table comments
+        query = """
+        SELECT 
+            TABLE_CATALOG as DATABASE_NAME,
+            TABLE_SCHEMA as SCHEMA_NAME,
+            TABLE_NAME,
+            COMMENT as TABLE_COMMENT,
+            ROW_COUNT,
+            BYTES
+        FROM INFORMATION_SCHEMA.TABLES
+        WHERE UPPER(COMMENT) LIKE UPPER('%' || ? || '%')
+        """
+    else:  # default to table_name search
+        query = """
+        SELECT 
+            TABLE_CATALOG as DATABASE_NAME,
+            TABLE_SCHEMA as SCHEMA_NAME,
+            TABLE_NAME,
+            COMMENT as TABLE_COMMENT,
+            ROW_COUNT,
+            BYTES
+        FROM INFORMATION_SCHEMA.TABLES
+        WHERE UPPER(TABLE_NAME) LIKE UPPER('%' || ? || '%')
+        """
+    
+    params = [search_pattern]
+    # The column search joins COLUMNS and TABLES, so qualify the filters
+    prefix = "c." if search_type == "column_name" else ""
+    
+    # Add database filter if provided
+    if database:
+        query += f"\nAND {prefix}TABLE_CATALOG = ?"
+        params.append(database)
+    
+    # Add schema filter if provided
+    if schema:
+        query += f"\nAND {prefix}TABLE_SCHEMA = ?"
+        params.append(schema)
+    
+    # Add grouping for column search; the table attributes are functionally
+    # dependent on the name, so only the identity columns are grouped on
+    if search_type == "column_name":
+        query += "\nGROUP BY c.TABLE_CATALOG, c.TABLE_SCHEMA, c.TABLE_NAME"
+    
+    # Add ordering, and page on the server; one extra row tells us whether
+    # there is more
+    limit, offset = int(limit), int(offset)
+    query += "\nORDER BY DATABASE_NAME, SCHEMA_NAME, TABLE_NAME"
+    query += f"\nLIMIT {limit + 1} OFFSET {offset}"
+    
+    # Execute the search
+    results, _ = await db.execute_query(query, params)
+    truncated = len(results) > limit
+    results = results[:limit]
+    
+    # Format results
+    formatted_results = [
+        {
+            "database": d,
+            "schema": sch,
+            "table": t,
+            "full_name": f"{d}.{sch}.{t}",
+            "comment": comment,
+            "row_count": row_count,
+            "size_bytes": size
         }
+        for d, sch, t, comment, row_count, size in map(_SEARCH_FIELDS, results)
+    ]
+    
+    # Add matching columns for column search
+    if search_type == "column_name":
+        for result, row in zip(formatted_results, results):
+            result["matching_columns"] = row["MATCHING_COLUMNS"]
+    
+    return {
+        'success': True,
+        'search_pattern': search_pattern,
+        'search_type': search_type,
+        'database_filter': database,
+        'schema_filter': schema,
+        'results_count': len(formatted_results),
+        'results': formatted_results,
+        'truncated': truncated,
+        'next_offset': offset + limit if truncated else None
+    }
+    
 
 @mcp.tool()
-async def get_table_relationships(table_name: str) -> Dict[str, Any]:
+@_require_auth
+@_cache_metadata
+@_catch_errors
+async def get_table_relationships(table_name: str, refresh: bool = False) -> Dict[str, Any]:
     """
     Get foreign key relationships and primary keys for a table.
     
     Args:
         table_name: Fully qualified table name (database.schema.table)
+        refresh: Bypass the short-lived metadata cache (default: false)
     """
-    if not db:
+    # Validate the name and reject placeholders in one match
+    m = _FQN_RE.match(table_name)
+    if not m:
+        if _NAME_PLACEHOLDER_RE.search(table_name):
+            return _placeholder_table_error(table_name)
         return {
             'success': False,
-            'error': 'Not authenticated. Please use authenticate_snowflake first.'
+            'error': 'Table name must be in format "database.schema.table"'
         }
     
-    # Check for placeholder values
-    if '<' in table_name or '>' in table_name or 'placeholder' in table_name.lower():
-        return {
-            'success': False,
-            'error': f'Table name contains placeholder value: "{table_name}". Please use an actual table name from list_tables or search_tables.',
-            'hint': 'First use list_tables or search_tables to find actual table names, then use the fully qualified name (database.schema.table).'
-        }
-    
-    try:
-        # Parse table name
-        parts = table_name.split(".")
-        if len(parts) == 3:
-            db_name, schema_name, table = parts
+    db_name, schema_name, table = (g.upper() for g in m.groups())
+    
+    # One round trip for outgoing FKs, incoming FKs and the primary key
+    relationships_query = _RELATIONSHIPS_SQL.format(info_schema=f"{db_name}.INFORMATION_SCHEMA")
+    rows, _ = await db.execute_query(relationships_query, [db_name, schema_name, table])
+    
+    # Partition by branch tag
+    outgoing_fks = []  # This table references other tables
+    incoming_fks = []  # Other tables reference this table
+    primary_keys = []
+    to_tables, from_tables = set(), set()  # Distinct tables on each side
+    
+    for row in rows:
+        kind = row["KIND"]
+        if kind == "OUT":
+            to_table = f"{row['PK_DATABASE']}.{row['PK_SCHEMA']}.{row['PK_TABLE']}"
+            to_tables.add(to_table)
+            outgoing_fks.append({
+                "constraint_name": row["CONSTRAINT_NAME"],
+                "from_column": row["FK_COLUMN"],
+                "to_table": to_table,
+                "to_column": row["PK_COLUMN"]
+            })
+        elif kind == "IN":
+            from_table = f"{row['FK_DATABASE']}.{row['FK_SCHEMA']}.{row['FK_TABLE']}"
+            from_tables.add(from_table)
+            incoming_fks.append({
+                "constraint_name": row["CONSTRAINT_NAME"],
+                "from_table": from_table,
+                "from_column": row["FK_COLUMN"],
+                "to_column": row["PK_COLUMN"]
+            })
         else:
-            return {
-                'success': False,
-                'error': 'Table name must be in format "database.schema.table"'
-            }
-        
-        # Query for foreign key constraints
-        fk_query = f"""
-        SELECT 
-            fk.CONSTRAINT_NAME,
-            fk.TABLE_CATALOG as FK_DATABASE,
-            fk.TABLE_SCHEMA as FK_SCHEMA,
-            fk.TABLE_NAME as FK_TABLE,
-            fk.COLUMN_NAME as FK_COLUMN,
-            pk.TABLE_CATALOG as PK_DATABASE,
-            pk.TABLE_SCHEMA as PK_SCHEMA,
-            pk.TABLE_NAME as PK_TABLE,
-            pk.COLUMN_NAME as PK_COLUMN
-        FROM INFORMATION_SCHEMA.REFERENTIAL_CONSTRAINTS rc
-        JOIN INFORMATION_SCHEMA.TABLE_CONSTRAINTS tc
-            ON rc.CONSTRAINT_CATALOG = tc.CONSTRAINT_CATALOG
-            AND rc.CONSTRAINT_SCHEMA = tc.CONSTRAINT_SCHEMA
-            AND rc.CONSTRAINT_NAME = tc.CONSTRAINT_NAME
-        JOIN INFORMATION_SCHEMA.KEY_COLUMN_USAGE fk
-            ON rc.CONSTRAINT_CATALOG = fk.CONSTRAINT_CATALOG
-            AND rc.CONSTRAINT_SCHEMA = fk.CONSTRAINT_SCHEMA
-            AND rc.CONSTRAINT_NAME = fk.CONSTRAINT_NAME
-        JOIN INFORMATION_SCHEMA.KEY_COLUMN_USAGE pk
-            ON rc.UNIQUE_CONSTRAINT_CATALOG = pk.CONSTRAINT_CATALOG
-            AND rc.UNIQUE_CONSTRAINT_SCHEMA = pk.CONSTRAINT_SCHEMA
-            AND rc.UNIQUE_CONSTRAINT_NAME = pk.CONSTRAINT_NAME
-        WHERE (fk.TABLE_CATALOG = '{db_name}' AND fk.TABLE_SCHEMA = '{schema_name}' AND fk.TABLE_NAME = '{table}')
-           OR (pk.TABLE_CATALOG = '{db_name}' AND pk.TABLE_SCHEMA = '{schema_name}' AND pk.TABLE_NAME = '{table}')
-        ORDER BY fk.CONSTRAINT_NAME, fk.ORDINAL_POSITION
-        """
-        
-        fk_results, _ = await db.execute_query(fk_query)
-        
-        # Also look for primary key constraints
-        pk_query = f"""
-        SELECT 
-            CONSTRAINT_NAME,
-            COLUMN_NAME,
-            ORDINAL_POSITION
-        FROM INFORMATION_SCHEMA.KEY_COLUMN_USAGE
-        WHERE TABLE_CATALOG = '{db_name}'
-            AND TABLE_SCHEMA = '{schema_name}'
-            AND TABLE_NAME = '{table}'
-            AND CONSTRAINT_NAME IN (
-                SELECT CONSTRAINT_NAME 
-                FROM INFORMATION_SCHEMA.TABLE_CONSTRAINTS
-                WHERE TABLE_CATALOG = '{db_name}'
-                    AND TABLE_SCHEMA = '{schema_name}'
-                    AND TABLE_NAME = '{table}'
-                    AND CONSTRAINT_TYPE = 'PRIMARY KEY'
-            )
-        ORDER BY ORDINAL_POSITION
-        """
-        
-        pk_results, _ = await db.execute_query(pk_query)
-        
-        # Process foreign key relationships
-        outgoing_fks = []  # This table references other tables
-        incoming_fks = []  # Other tables reference this table
-        
-        for row in fk_results:
-            if (row["FK_DATABASE"] == db_name and 
-                row["FK_SCHEMA"] == schema_name and 
-                row["FK_TABLE"] == table):
-                # Outgoing FK (this table references another)
-                outgoing_fks.append({
-                    "constraint_name": row["CONSTRAINT_NAME"],
-                    "from_column": row["FK_COLUMN"],
-                    "to_table": f"{row['PK_DATABASE']}.{row['PK_SCHEMA']}.{row['PK_TABLE']}",
-                    "to_column": row["PK_COLUMN"]
-                })
-            else:
-                # Incoming FK (another table references this)
-                incoming_fks.append({
-                    "constraint_name": row["CONSTRAINT_NAME"],
-                    "from_table": f"{row['FK_DATABASE']}.{row['FK_SCHEMA']}.{row['FK_TABLE']}",
-                    "from_column": row["FK_COLUMN"],
-                    "to_column": row["PK_COLUMN"]
-                })
-        
-        # Process primary keys
-        primary_keys = [row["COLUMN_NAME"] for row in pk_results]
-        
-        return {
-            'success': True,
-            'table_name': table_name,
-            'primary_keys': primary_keys,
-            'foreign_keys': {
-                'outgoing': outgoing_fks,
-                'incoming': incoming_fks
-            },
-            'relationship_summary': {
-                'references_tables': len(set(fk["to_table"] for fk in outgoing_fks)),
-                'referenced_by_tables': len(set(fk["from_table"] for fk in incoming_fks)),
-                'total_relationships': len(outgoing_fks) + len(incoming_fks)
-            }
-        }
-        
-    except Exception as e:
-        return {
-            'success': False,
-            'error': str(e)
+            primary_keys.append(row["PK_COLUMN"])
+    
+    return {
+        'success': True,
+        'table_name': table_name,
+        'primary_keys': primary_keys,
+        'foreign_keys': {
+            'outgoing': outgoing_fks,
+            'incoming': incoming_fks
+        },
+        'relationship_summary': {
+            'references_tables': len(to_tables),
+            'referenced_by_tables': len(from_tables),
+            'total_relationships': len(outgoing_fks) + len(incoming_fks)
         }
+    }
+    
+
 
+async def _fetch_context_columns(tables: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Fetch the columns of several fully qualified tables in one round trip.
+    
+    Returns upper-cased database.schema.table -> [{'name', 'type', 'comment'}],
+    using one INFORMATION_SCHEMA.COLUMNS branch per database.
+    """
+    by_database: Dict[str, List[tuple]] = {}
+    for table_name in tables:
+        database, schema, table = (g.upper() for g in _FQN_RE.match(table_name).groups())
+        by_database.setdefault(database, []).append((schema, table))
+    if not by_database:
+        return {}
+    
+    branches, params = [], []
+    for database, names in by_database.items():
+        matches = " OR ".join(["(TABLE_SCHEMA = ? AND TABLE_NAME = ?)"] * len(names))
+        branches.append(f"""
+        SELECT TABLE_CATALOG || '.' || TABLE_SCHEMA || '.' || TABLE_NAME AS FQN,
+            COLUMN_NAME, DATA_TYPE, COMMENT, ORDINAL_POSITION
+        FROM {database}.INFORMATION_SCHEMA.COLUMNS
+        WHERE {matches}""")
+        params.extend(part for name in names for part in name)
+    query = "\n        UNION ALL".join(branches).lstrip() + "\n        ORDER BY FQN, ORDINAL_POSITION"
+    
+    rows, _ = await db.execute_query(query, params)
+    columns: Dict[str, List[Dict[str, Any]]] = {}
+    for row in rows:
+        columns.setdefault(row["FQN"], []).append(
+            {"name": row["COLUMN_NAME"], "type": row["DATA_TYPE"], "comment": row["COMMENT"]}
+        )
+    return columns
+
+async def _fetch_table_context(table_name: str):
+    """
+    Fetch three sample rows of a table, plus DESCRIBE output when its columns
+    can't come from _fetch_context_columns (names that aren't fully qualified)
+    """
+    if not _TABLE_REF_RE.fullmatch(table_name):
+        raise ValueError(f"Invalid table name: {table_name}")
+    sample = db.execute_query(f"SELECT * FROM {table_name} LIMIT 3")
+    if _FQN_RE.match(table_name):
+        return None, await sample
+    (columns, _), sample_result = await asyncio.gather(
+        db.execute_query(f"DESCRIBE TABLE {table_name}"), sample
+    )
+    return columns, sample_result
+
+def _cortex_completion_text(raw: str) -> str:
+    """
+    The model's text from a CORTEX.COMPLETE result.
+    
+    Called with an options object, COMPLETE returns a JSON envelope
+    ({"choices": [{"messages": ...}], "usage": ...}) rather than plain text.
+    """
+    try:
+        return _loads(raw)["choices"][0]["messages"]
+    except (ValueError, TypeError, KeyError, IndexError):
+        return raw
 
 @mcp.tool()
+@_require_auth
 async def cortex_analyst(
     question: str,
     context_tables: Optional[List[str]] = None,
@@ -1091,42 +1547,48 @@ async def cortex_analyst(
         question: The natural language question to ask about your data
         context_tables: List of table names to provide as context (e.g., ['DB.SCHEMA.ORDERS'])
         model: The LLM model to use (default: 'mistral-large2')
-        execute_sql: Whether to execute the generated SQL query and return results
+        execute_sql: Whether to execute the generated SQL query and return results;
+            when false, the model's plain-text response is returned instead
         temperature: Temperature for response generation (0.0-1.0, default: 0.0)
         max_tokens: Maximum tokens for the response (default: 4096)
     """
-    if not db:
-        return {
-            'success': False,
-            'error': 'Not authenticated. Please use authenticate_snowflake first.'
-        }
-    
     try:
         # Build context from specified tables
         context = ""
         if context_tables:
-            context = "Database context:\n"
-            for table_name in context_tables[:5]:  # Limit to 5 tables
-                try:
-                    # Get table schema
-                    desc_query = f"DESCRIBE TABLE {table_name}"
-                    columns, _ = await db.execute_query(desc_query)
-                    
-                    context += f"\nTable: {table_name}\nColumns:\n"
-                    for col in columns[:20]:  # Limit columns
-                        context += f"  - {col['name']}: {col['type']}"
-                        if col.get('comment'):
-                            context += f" ({col['comment']})"
-                        context += "\n"
-                    
-                    # Get sample data
-                    sample_query = f"SELECT * FROM {table_name} LIMIT 3"
-                    sample_data, _ = await db.execute_query(sample_query)
-                    if sample_data:
-                        context += f"Sample data: {json.dumps(sample_data[:3], indent=2)}\n"
-                        
-                except Exception as e:
-                    debug_print(f"Failed to get context for table {table_name}: {str(e)}")
+            parts = ["Database context:"]
+            tables = context_tables[:5]  # Limit to 5 tables
+            # One batched column lookup for the fully qualified tables, and the
+            # samples (plus DESCRIBE for anything else) concurrently alongside it
+            qualified = [t for t in tables if _FQN_RE.match(t)]
+            batched_columns, *results = await asyncio.gather(
+                _fetch_context_columns(qualified),
+                *map(_fetch_table_context, tables),
+                return_exceptions=True
+            )
+            if isinstance(batched_columns, Exception):
+                debug_print(f"Failed to get columns for context tables: {str(batched_columns)}")
+                batched_columns = {}
+            
+            for table_name, result in zip(tables, results):
+                if isinstance(result, Exception):
+                    debug_print(f"Failed to get context for table {table_name}: {str(result)}")
+                    continue
+                
+                columns, (sample_data, _) = result
+                if columns is None:
+                    columns = batched_columns.get(table_name.upper(), [])
+                parts.append(f"\nTable: {table_name}\nColumns:")
+                parts.extend(
+                    f"  - {col['name']}: {col['type']}"
+                    + (f" ({col['comment'][:80]})" if col.get('comment') else "")
+                    for col in columns[:20]  # Limit columns
+                )
+                
+                # Compact JSON keeps the prompt (and Cortex token usage) small
+                if sample_data:
+                    parts.append("Sample data: " + _dumps_compact(sample_data[:3]))
+            context = "\n".join(parts) + "\n"
         
         # Construct the prompt
         prompt = f"""You are a SQL expert analyzing a Snowflake database. 
@@ -1138,38 +1600,37 @@ Please provide:
 1. A clear answer to the question
 2. The SQL query that would answer this question
 3. Any relevant insights or recommendations
-
-Format your response as JSON with keys: "answer", "sql_query", "insights"
 """
         
+        # The model and prompt are bound; the numeric options are formatted
+        # from float/int so only numbers reach the SQL text
+        options = f"'temperature': {float(temperature)}, 'max_tokens': {int(max_tokens)}"
+        
+        # Without SQL execution nothing needs the structured fields, so skip the
+        # (slower) JSON response format and return the model's text as is
+        if not execute_sql:
+            cortex_query = f"SELECT SNOWFLAKE.CORTEX.COMPLETE(?, ?, {{{options}}}) as response"
+            result, _ = await db.execute_query(cortex_query, [model, prompt])
+            if not result:
+                raise ValueError("No response received from Cortex")
+            return {
+                'success': True,
+                'question': question,
+                'model': model,
+                'response': _cortex_completion_text(result[0]["RESPONSE"])
+            }
+        
         # Use CORTEX.COMPLETE function with structured output
-        cortex_query = f"""
-        SELECT SNOWFLAKE.CORTEX.COMPLETE(
-            '{model}',
-            '{prompt.replace("'", "''")}',
-            {{
-                'temperature': {temperature},
-                'max_tokens': {max_tokens},
-                'response_format': {{
-                    'type': 'json_object',
-                    'schema': {{
-                        'type': 'object',
-                        'properties': {{
-                            'answer': {{'type': 'string'}},
-                            'sql_query': {{'type': 'string'}},
-                            'insights': {{'type': 'array', 'items': {{'type': 'string'}}}}
-                        }},
-                        'required': ['answer', 'sql_query']
-                    }}
-                }}
-            }}
-        ) as response;
-        """
+        prompt += '\nFormat your response as JSON with keys: "answer", "sql_query", "insights"\n'
+        cortex_query = (
+            "SELECT SNOWFLAKE.CORTEX.COMPLETE(?, ?, "
+            f"{{{options}, 'response_format': {_CORTEX_RESPONSE_FORMAT}}}) as response"
+        )
         
-        result, _ = await db.execute_query(cortex_query)
+        result, _ = await db.execute_query(cortex_query, [model, prompt])
         
         if result and len(result) > 0:
-            response = json.loads(result[0]["RESPONSE"])
+            response = _loads(result[0]["RESPONSE"])
             
             # Format the output
             output = {
@@ -1182,8 +1643,8 @@ Format your response as JSON with keys: "answer", "sql_query", "insights"
                 'query_results': None
             }
             
-            # Execute the generated SQL if requested
-            if execute_sql and output["sql_query"]:
+            # Execute the generated SQL
+            if output["sql_query"]:
                 try:
                     # Clean the SQL query
                     sql_query = output["sql_query"].strip()
@@ -1206,14 +1667,12 @@ Format your response as JSON with keys: "answer", "sql_query", "insights"
         
         # Fallback to simpler approach without structured output
         try:
-            simple_query = f"""
-            SELECT SNOWFLAKE.CORTEX.COMPLETE(
-                '{model}',
-                'User question: {question.replace("'", "''")}\\n\\nProvide a SQL query to answer this question and explain your approach.'
-            ) as response;
+            simple_query = """
+            SELECT SNOWFLAKE.CORTEX.COMPLETE(?, ?) as response;
             """
+            simple_prompt = f"User question: {question}\n\nProvide a SQL query to answer this question and explain your approach."
             
-            result, _ = await db.execute_query(simple_query)
+            result, _ = await db.execute_query(simple_query, [model, simple_prompt])
             if result and len(result) > 0:
                 return {
                     'success': True,
@@ -1232,146 +1691,188 @@ Format your response as JSON with keys: "answer", "sql_query", "insights"
             'suggestion': 'Ensure you have the SNOWFLAKE.CORTEX_USER role and Cortex is enabled for your account'
         }
 
+async def _table_metadata_source() -> tuple:
+    """
+    Pick the view get_data_summary reads table metadata from.
+    
+    Returns (view, filters). SNOWFLAKE.ACCOUNT_USAGE.TABLES is much faster than
+    INFORMATION_SCHEMA.TABLES but needs extra privileges, so access is probed
+    once per connection and remembered on db.
+    """
+    if db.account_usage_available is None:
+        try:
+            await db.execute_query("SELECT 1 FROM SNOWFLAKE.ACCOUNT_USAGE.TABLES LIMIT 1")
+            db.account_usage_available = True
+        except Exception:
+            db.account_usage_available = False
+    if db.account_usage_available:
+        return "SNOWFLAKE.ACCOUNT_USAGE.TABLES", ["DELETED IS NULL"]
+    return "INFORMATION_SCHEMA.TABLES", []
+
 @mcp.tool()
+@_require_auth
+@_cache_metadata
+@_catch_errors
 async def get_data_summary(
     database: Optional[str] = None,
     include_schemas: bool = True,
     include_largest_tables: bool = True,
-    include_recent_tables: bool = True
+    include_recent_tables: bool = True,
+    refresh: bool = False
 ) -> Dict[str, Any]:
     """
     Get a summary of the data warehouse including database statistics, largest tables, and recent changes.
     
+    Uses SNOWFLAKE.ACCOUNT_USAGE when the role can read it, which is much faster
+    but can lag behind recent changes by up to 90 minutes.
+    
     Args:
         database: Optional database name to filter results
         include_schemas: Include schema statistics (default: true)
         include_largest_tables: Include list of largest tables (default: true)
         include_recent_tables: Include recently created/modified tables (default: true)
+        refresh: Bypass the short-lived metadata cache (default: false)
     """
-    if not db:
-        return {
-            'success': False,
-            'error': 'Not authenticated. Please use authenticate_snowflake first.'
-        }
+    params = [database] if database else None
+    source, filters = await _table_metadata_source()
+    if database:
+        filters.append("TABLE_CATALOG = ?")
     
-    try:
-        results = {}
-        
-        # Get database statistics
-        db_query = "SELECT COUNT(DISTINCT TABLE_CATALOG) as database_count FROM INFORMATION_SCHEMA.TABLES"
-        if database:
-            db_query += f" WHERE TABLE_CATALOG = '{database}'"
-        
-        db_result, _ = await db.execute_query(db_query)
-        results["database_count"] = db_result[0]["DATABASE_COUNT"] if db_result else 0
-        
-        # Get schema statistics
-        if include_schemas:
-            schema_query = """
-            SELECT 
-                TABLE_CATALOG as DATABASE_NAME,
-                COUNT(DISTINCT TABLE_SCHEMA) as SCHEMA_COUNT,
-                COUNT(DISTINCT TABLE_NAME) as TABLE_COUNT,
-                SUM(ROW_COUNT) as TOTAL_ROWS,
-                SUM(BYTES) as TOTAL_BYTES
-            FROM INFORMATION_SCHEMA.TABLES
-            """
-            if database:
-                schema_query += f" WHERE TABLE_CATALOG = '{database}'"
-            schema_query += " GROUP BY TABLE_CATALOG ORDER BY TABLE_CATALOG"
-            
-            schema_results, _ = await db.execute_query(schema_query)
-            results["databases"] = [
-                {
-                    "database": row["DATABASE_NAME"],
-                    "schema_count": row["SCHEMA_COUNT"],
-                    "table_count": row["TABLE_COUNT"],
-                    "total_rows": row["TOTAL_ROWS"] or 0,
-                    "total_bytes": row["TOTAL_BYTES"] or 0,
-                    "total_gb": round((row["TOTAL_BYTES"] or 0) / (1024**3), 2)
-                }
-                for row in schema_results
-            ]
-        
-        # Get largest tables
-        if include_largest_tables:
-            largest_query = """
-            SELECT 
-                TABLE_CATALOG as DATABASE_NAME,
-                TABLE_SCHEMA as SCHEMA_NAME,
-                TABLE_NAME,
-                ROW_COUNT,
-                BYTES,
-                ROUND(BYTES / (1024*1024*1024), 2) as SIZE_GB
-            FROM INFORMATION_SCHEMA.TABLES
-            WHERE ROW_COUNT > 0
-            """
-            if database:
-                largest_query += f" AND TABLE_CATALOG = '{database}'"
-            largest_query += " ORDER BY BYTES DESC NULLS LAST LIMIT 10"
-            
-            largest_results, _ = await db.execute_query(largest_query)
-            results["largest_tables"] = [
-                {
-                    "full_name": f"{row['DATABASE_NAME']}.{row['SCHEMA_NAME']}.{row['TABLE_NAME']}",
-                    "row_count": row["ROW_COUNT"],
-                    "size_bytes": row["BYTES"],
-                    "size_gb": row["SIZE_GB"]
-                }
-                for row in largest_results
-            ]
+    def where(*conditions: str) -> str:
+        clauses = [*filters, *conditions]
+        return f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    
+    # Count databases; only needed when neither the filter nor the schema
+    # statistics already determine it, and SHOW DATABASES avoids a table scan
+    async def database_count():
+        db_result, _ = await db.execute_query("SHOW DATABASES")
+        return len(db_result)
+    
+    # Get schema statistics
+    async def databases():
+        schema_query = f"""
+        SELECT 
+            TABLE_CATALOG as DATABASE_NAME,
+            COUNT(DISTINCT TABLE_SCHEMA) as SCHEMA_COUNT,
+            COUNT(DISTINCT TABLE_NAME) as TABLE_COUNT,
+            SUM(ROW_COUNT) as TOTAL_ROWS,
+            SUM(BYTES) as TOTAL_BYTES
+        FROM {source}{where()}
+        """
+        schema_query += " GROUP BY TABLE_CATALOG ORDER BY TABLE_CATALOG"
         
-        # Get recently created/modified tables
-        if include_recent_tables:
-            recent_query = """
-            SELECT 
-                TABLE_CATALOG as DATABASE_NAME,
-                TABLE_SCHEMA as SCHEMA_NAME,
-                TABLE_NAME,
-                CREATED,
-                LAST_ALTERED,
-                ROW_COUNT
-            FROM INFORMATION_SCHEMA.TABLES
-            WHERE CREATED IS NOT NULL
-            """
-            if database:
-                recent_query += f" AND TABLE_CATALOG = '{database}'"
-            recent_query += " ORDER BY GREATEST(CREATED, LAST_ALTERED) DESC LIMIT 10"
-            
-            recent_results, _ = await db.execute_query(recent_query)
-            results["recent_tables"] = [
-                {
-                    "full_name": f"{row['DATABASE_NAME']}.{row['SCHEMA_NAME']}.{row['TABLE_NAME']}",
-                    "created": str(row["CREATED"]) if row["CREATED"] else None,
-                    "last_altered": str(row["LAST_ALTERED"]) if row["LAST_ALTERED"] else None,
-                    "row_count": row["ROW_COUNT"] or 0
-                }
-                for row in recent_results
-            ]
+        schema_results, _ = await db.execute_query(schema_query, params)
+        return [
+            {
+                "database": row["DATABASE_NAME"],
+                "schema_count": row["SCHEMA_COUNT"],
+                "table_count": row["TABLE_COUNT"],
+                "total_rows": row["TOTAL_ROWS"] or 0,
+                "total_bytes": row["TOTAL_BYTES"] or 0,
+                "total_gb": round((row["TOTAL_BYTES"] or 0) / (1024**3), 2)
+            }
+            for row in schema_results
+        ]
+    
+    # Get largest tables
+    async def largest_tables():
+        largest_query = f"""
+        SELECT 
+            TABLE_CATALOG as DATABASE_NAME,
+            TABLE_SCHEMA as SCHEMA_NAME,
+            TABLE_NAME,
+            ROW_COUNT,
+            BYTES,
+            ROUND(BYTES / (1024*1024*1024), 2) as SIZE_GB
+        FROM {source}{where("ROW_COUNT > 0")}
+        """
+        largest_query += " ORDER BY BYTES DESC NULLS LAST LIMIT 10"
         
-        # Calculate summary statistics
-        if "databases" in results:
-            total_tables = sum(db_info["table_count"] for db_info in results["databases"])
-            total_rows = sum(db_info["total_rows"] for db_info in results["databases"])
-            total_gb = sum(db_info["total_gb"] for db_info in results["databases"])
-            
-            results["summary"] = {
-                "total_databases": len(results["databases"]),
-                "total_tables": total_tables,
-                "total_rows": total_rows,
-                "total_size_gb": round(total_gb, 2)
+        largest_results, _ = await db.execute_query(largest_query, params)
+        return [
+            {
+                "full_name": f"{d}.{sch}.{t}",
+                "row_count": row_count,
+                "size_bytes": size,
+                "size_gb": size_gb
             }
+            for d, sch, t, row_count, size, size_gb in map(_LARGEST_FIELDS, largest_results)
+        ]
+    
+    # Get recently created/modified tables
+    async def recent_tables():
+        recent_query = f"""
+        SELECT 
+            TABLE_CATALOG as DATABASE_NAME,
+            TABLE_SCHEMA as SCHEMA_NAME,
+            TABLE_NAME,
+            CREATED,
+            LAST_ALTERED,
+            ROW_COUNT
+        FROM {source}{where("CREATED IS NOT NULL")}
+        """
+        recent_query += " ORDER BY GREATEST(CREATED, LAST_ALTERED) DESC LIMIT 10"
         
-        return {
-            'success': True,
-            **results
-        }
+        recent_results, _ = await db.execute_query(recent_query, params)
+        return [
+            {
+                "full_name": f"{d}.{sch}.{t}",
+                "created": str(created) if created else None,
+                "last_altered": str(altered) if altered else None,
+                "row_count": row_count or 0
+            }
+            for d, sch, t, created, altered, row_count in map(_RECENT_FIELDS, recent_results)
+        ]
+    
+    # The sections are independent, so run their queries concurrently
+    sections = {}
+    if not include_schemas and not database:
+        sections["database_count"] = database_count()
+    if include_schemas:
+        sections["databases"] = databases()
+    if include_largest_tables:
+        sections["largest_tables"] = largest_tables()
+    if include_recent_tables:
+        sections["recent_tables"] = recent_tables()
+    
+    gathered = await asyncio.gather(*sections.values(), return_exceptions=True)
+    
+    # A failing section is reported under 'errors' instead of failing the summary
+    results = {}
+    errors = {}
+    for name, value in zip(sections, gathered):
+        if isinstance(value, Exception):
+            errors[name] = str(value)
+        else:
+            results[name] = value
+    if sections and len(errors) == len(sections):
+        raise gathered[0]
+    if errors:
+        results["errors"] = errors
+    
+    if "databases" in results:
+        results = {"database_count": len(results["databases"]), **results}
+    elif database and not include_schemas:
+        results = {"database_count": 1, **results}
+    
+    # Calculate summary statistics
+    if "databases" in results:
+        total_tables = sum(db_info["table_count"] for db_info in results["databases"])
+        total_rows = sum(db_info["total_rows"] for db_info in results["databases"])
+        total_gb = sum(db_info["total_gb"] for db_info in results["databases"])
         
-    except Exception as e:
-        return {
-            'success': False,
-            'error': str(e)
+        results["summary"] = {
+            "total_databases": len(results["databases"]),
+            "total_tables": total_tables,
+            "total_rows": total_rows,
+            "total_size_gb": round(total_gb, 2)
         }
+    
+    return {
+        'success': True,
+        **results
+    }
+    
 
 
 # Run the server if executed directly
@@ -1388,11 +1889,16 @@ if __name__ == "__main__":
     args = parser.parse_args()
     
     # Override config with command line arguments
+    overrides = {}
     if args.allow_write:
-        config['allow_write'] = True
+        overrides['allow_write'] = True
     if args.debug:
-        config['debug'] = True
+        overrides['debug'] = True
+    if overrides:
+        config = MappingProxyType({**config, **overrides})
+        _DEBUG_ENABLED = _DEBUG_ENABLED or config["debug"]
+        _ALLOW_WRITE = config["allow_write"]
     
     
-    debug_print(f"Starting Snowflake MCP Server (allow_write={config['allow_write']})")
+    debug_print(f"Starting Snowflake MCP Server (allow_write={_ALLOW_WRITE})")
     mcp.run()
\ No newline at end of file
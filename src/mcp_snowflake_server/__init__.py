@@ -2,9 +2,6 @@ import argparse
 import asyncio
 import os
 
-import dotenv
-import snowflake.connector
-
 # Note: server module has been deprecated - use the root server.py file instead
 
 
@@ -41,21 +38,10 @@ def parse_args():
     # First, get all the arguments we don't know about
     args, unknown = parser.parse_known_args()
 
-    # Create a dictionary to store our key-value pairs
-    connection_args = {}
-
-    # Iterate through unknown args in pairs
-    for i in range(0, len(unknown), 2):
-        if i + 1 >= len(unknown):
-            break
-
-        key = unknown[i]
-        value = unknown[i + 1]
-
-        # Make sure it's a keyword argument (starts with --)
-        if key.startswith("--"):
-            key = key[2:]  # Remove the '--'
-            connection_args[key] = value
+    # Take unknown args in (key, value) pairs, keeping keyword arguments
+    # (starting with --) with the '--' removed; a trailing odd arg is ignored
+    pairs = zip(unknown[0::2], unknown[1::2])
+    connection_args = {key[2:]: value for key, value in pairs if key.startswith("--")}
 
     # Now we can add the known args to kwargs
     server_args = {
@@ -71,6 +57,10 @@ def parse_args():
 
 def main():
     """Main entry point for the package."""
+    # Imported here so that importing the package (as server.py does for its
+    # submodules) doesn't load dotenv and the Snowflake connector up front
+    import dotenv
+    import snowflake.connector
 
     dotenv.load_dotenv()
 
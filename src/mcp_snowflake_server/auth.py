@@ -5,139 +5,345 @@ Provides secure credential storage and authentication management.
 """
 
 import os
+import atexit
 import json
+import queue
+import hashlib
+import time
+from contextlib import contextmanager
+from functools import partial
 from pathlib import Path
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
-from cryptography.fernet import Fernet
-import snowflake.connector
+
+# orjson is optional; fall back to the stdlib json module when it's missing
+try:
+    import orjson
+
+    _loads = orjson.loads
+    _dumps_bytes = orjson.dumps
+except ImportError:
+    _loads = json.loads
+
+    def _dumps_bytes(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+
+
+POOL_MAX = 5
+LOGIN_TIMEOUT = 30
+NETWORK_TIMEOUT = 60
+
+AUTH_TTL_OK = 300
+AUTH_TTL_FAIL = 30
+DISCOVER_TTL = 60
+AUTH_CACHE_MAX = 128
+
+# (idle connections, bound connect, (account, user)) keyed by a hash of the
+# connection params
+_POOLS: Dict[str, tuple] = {}
+
+
+# snowflake.connector and cryptography pull in OpenSSL bindings and take a
+# noticeable part of startup, so they are imported on first use
+def _connector():
+    import snowflake.connector
+    return snowflake.connector
+
+
+def _fernet():
+    from cryptography.fernet import Fernet
+    return Fernet
+
+
+def _invalid_token():
+    from cryptography.fernet import InvalidToken
+    return InvalidToken
+
+
+def _params_key(connection_params: Dict[str, Any]) -> str:
+    """Stable hash of connection params, used as a pool/cache key"""
+    return hashlib.sha256(json.dumps(connection_params, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _make_connect(connection_params: Dict[str, Any], **options) -> partial:
+    """Bind connect() to these params (plus timeouts and options) once, for reuse"""
+    return partial(
+        _connector().connect,
+        **{
+            'login_timeout': LOGIN_TIMEOUT,
+            'network_timeout': NETWORK_TIMEOUT,
+            'client_session_keep_alive': True,
+            **options,
+            **connection_params,
+        }
+    )
+
+
+def _drain(pool: queue.Queue):
+    """Close every idle connection in a pool"""
+    while True:
+        try:
+            conn = pool.get_nowait()
+        except queue.Empty:
+            return
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+def _drop_pool(key: str):
+    """Forget the pool for one params hash, closing its idle connections"""
+    entry = _POOLS.pop(key, None)
+    if entry is not None:
+        _drain(entry[0])
+
+
+def _login_matches(login: tuple, account: Optional[str], username: Optional[str]) -> bool:
+    """
+    Whether an (account, user) pair falls under an account (and optionally one
+    user), or under everything when neither is given; mirrors
+    SecureStorage.delete_credentials
+    """
+    if account is None and username is None:
+        return True
+    return account == login[0] and (username is None or username == login[1])
+
+
+def _close_pools(account: Optional[str] = None, username: Optional[str] = None):
+    """Drop the pools for an account (and optionally one user), or all pools"""
+    for key, (_, _, login) in list(_POOLS.items()):
+        if _login_matches(login, account, username):
+            _drop_pool(key)
+
+
+atexit.register(_close_pools)
+
+
+@contextmanager
+def _pooled_conn(connection_params: Dict[str, Any]):
+    """Check out a live connection for these params, returning it to the pool afterwards"""
+    key = _params_key(connection_params)
+    entry = _POOLS.get(key)
+    if entry is None:
+        entry = _POOLS[key] = (
+            queue.Queue(),
+            _make_connect(connection_params),
+            (connection_params.get('account'), connection_params.get('user')),
+        )
+    pool, connect, _ = entry
+    conn = None
+    while conn is None:
+        try:
+            conn = pool.get_nowait()
+        except queue.Empty:
+            break
+        if conn.is_closed():
+            conn = None
+    if conn is None:
+        try:
+            conn = connect()
+        except Exception:
+            # Bad or revoked credentials; don't keep a pool around for them
+            _drop_pool(key)
+            raise
+    try:
+        yield conn
+    except Exception:
+        # Don't hand a possibly broken connection to the next caller
+        try:
+            conn.close()
+        except Exception:
+            pass
+        raise
+    # The pool may have been dropped meanwhile (failed login, deleted credentials)
+    if _POOLS.get(key) is entry and pool.qsize() < POOL_MAX:
+        pool.put(conn)
+    else:
+        conn.close()
+
+
+# SNOWFLAKE_MCP_HOME relocates the key and credentials, e.g. to a scratch dir in tests
+_STORAGE_DIR = Path(os.environ.get('SNOWFLAKE_MCP_HOME') or Path.home() / '.snowflake-mcp')
+# Append-only log of encrypted records, one Fernet token per line
+_CREDENTIALS_PATH = _STORAGE_DIR / 'credentials.log'
+# Older single-snapshot file, migrated into the log on first load
+_LEGACY_CREDENTIALS_PATH = _STORAGE_DIR / 'credentials.enc'
+# Rewrite the log as a single snapshot record once it grows past this
+_COMPACT_BYTES = 64 * 1024
+_KEY_PATH = _STORAGE_DIR / '.key'
+
+# Fernet instances by key, shared between SecureStorage instances
+_CIPHERS: Dict[bytes, Any] = {}
 
 
 class SecureStorage:
     """Secure credential storage with encryption"""
     
     def __init__(self):
-        self.storage_path = Path.home() / '.snowflake-mcp' / 'credentials.enc'
+        self.storage_path = _CREDENTIALS_PATH
         self.storage_path.parent.mkdir(parents=True, exist_ok=True)
         self.key = self._get_or_create_key()
-        self.cipher = Fernet(self.key)
+        self._cache: Optional[Dict[str, Any]] = None
+        # (mtime_ns, size) of the log when _cache was built
+        self._cache_stamp: Optional[tuple] = None
+    
+    @property
+    def cipher(self):
+        """Fernet cipher for the storage key, created on first use"""
+        cipher = _CIPHERS.get(self.key)
+        if cipher is None:
+            cipher = _CIPHERS[self.key] = _fernet()(self.key)
+        return cipher
     
     def _get_or_create_key(self) -> bytes:
         """Get or create encryption key"""
-        key_path = Path.home() / '.snowflake-mcp' / '.key'
+        key_path = _KEY_PATH
         if key_path.exists():
             return key_path.read_bytes()
         else:
-            key = Fernet.generate_key()
+            key = _fernet().generate_key()
             key_path.write_bytes(key)
-            # Set restrictive permissions (Unix-like systems)
-            try:
-                os.chmod(key_path, 0o600)
-            except:
-                pass  # Windows doesn't support chmod
+            self._secure(key_path)
             return key
     
-    def save_credentials(self, account: str, username: str, connection_params: Dict[str, Any]):
-        """Save encrypted credentials"""
+    @staticmethod
+    def _apply(creds: Dict[str, Any], record: Dict[str, Any]):
+        """Replay one log record onto the credentials dict"""
+        op = record['op']
+        if op == 'snapshot':
+            creds.clear()
+            creds.update(record['creds'])
+        elif op == 'put':
+            creds.setdefault(record['account'], {})[record['user']] = record['entry']
+        elif op == 'del':
+            account, username = record['account'], record.get('user')
+            if username is None:
+                creds.pop(account, None)
+            elif account in creds:
+                creds[account].pop(username, None)
+                if not creds[account]:
+                    creds.pop(account, None)
+    
+    def _load(self) -> Dict[str, Any]:
+        """Decrypted credentials, replayed from the log only when it changes on disk"""
+        try:
+            st = self.storage_path.stat()
+        except FileNotFoundError:
+            self._cache, self._cache_stamp = None, None
+            return self._migrate_legacy()
+        stamp = (st.st_mtime_ns, st.st_size)
+        if self._cache is not None and stamp == self._cache_stamp:
+            return self._cache
+        # Undecodable JSON raises ValueError; malformed records KeyError/TypeError
+        bad_record = (_invalid_token(), ValueError, KeyError, TypeError)
         creds = {}
-        if self.storage_path.exists():
+        for line in self.storage_path.read_bytes().splitlines():
             try:
-                encrypted = self.storage_path.read_bytes()
-                decrypted = self.cipher.decrypt(encrypted)
-                creds = json.loads(decrypted)
-            except:
-                pass  # Start fresh if decryption fails
+                self._apply(creds, _loads(self.cipher.decrypt(line)))
+            except bad_record:
+                pass  # Skip records that can't be decrypted, e.g. a torn write
+        self._cache, self._cache_stamp = creds, stamp
+        return creds
+    
+    def _migrate_legacy(self) -> Dict[str, Any]:
+        """Move credentials from the old snapshot file into the log"""
+        if not _LEGACY_CREDENTIALS_PATH.exists():
+            return {}
+        try:
+            creds = _loads(self.cipher.decrypt(_LEGACY_CREDENTIALS_PATH.read_bytes()))
+        except (_invalid_token(), ValueError, OSError):
+            return {}  # Start fresh if decryption fails
+        self._compact(creds)
+        _LEGACY_CREDENTIALS_PATH.unlink()
+        return creds
+    
+    @staticmethod
+    def _secure(path: Path):
+        """Restrict a file to its owner (Unix-like systems; Windows doesn't support chmod)"""
+        if os.name != 'nt':
+            os.chmod(path, 0o600)
+    
+    def _append(self, creds: Dict[str, Any], record: Dict[str, Any]):
+        """
+        Apply a record to the cached credentials and append it to the log.
         
+        A delete, or a put that replaces an existing entry, compacts the log
+        instead, so the removed connection params don't stay on disk.
+        """
+        replaces = record['op'] == 'del' or record['user'] in creds.get(record['account'], {})
+        self._apply(creds, record)
+        if replaces:
+            self._compact(creds)
+            return
+        line = self.cipher.encrypt(_dumps_bytes(record)) + b'\n'
+        with self.storage_path.open('ab') as f:
+            # Only keep the cache if nobody else appended since we loaded it
+            in_sync = self._cache is creds and self._cache_stamp is not None and f.tell() == self._cache_stamp[1]
+            f.write(line)
+        self._secure(self.storage_path)
+        st = self.storage_path.stat()
+        if st.st_size > _COMPACT_BYTES:
+            self._compact(creds)
+        elif in_sync:
+            self._cache, self._cache_stamp = creds, (st.st_mtime_ns, st.st_size)
+        else:
+            self._cache, self._cache_stamp = None, None
+    
+    def _compact(self, creds: Dict[str, Any]):
+        """Replace the log with a single snapshot record"""
+        tmp_path = self.storage_path.with_suffix('.tmp')
+        tmp_path.write_bytes(self.cipher.encrypt(_dumps_bytes({'op': 'snapshot', 'creds': creds})) + b'\n')
+        self._secure(tmp_path)
+        os.replace(tmp_path, self.storage_path)
+        st = self.storage_path.stat()
+        self._cache, self._cache_stamp = creds, (st.st_mtime_ns, st.st_size)
+    
+    def save_credentials(self, account: str, username: str, connection_params: Dict[str, Any]):
+        """Save encrypted credentials"""
         # Store by account and username
-        if account not in creds:
-            creds[account] = {}
-        
-        # Don't store the password in plain text in memory
-        creds[account][username] = {
-            'connection_params': connection_params,
-            'saved_at': datetime.now().isoformat()
-        }
-        
-        encrypted = self.cipher.encrypt(json.dumps(creds).encode())
-        self.storage_path.write_bytes(encrypted)
-        try:
-            os.chmod(self.storage_path, 0o600)
-        except:
-            pass  # Windows doesn't support chmod
+        self._append(self._load(), {
+            'op': 'put',
+            'account': account,
+            'user': username,
+            'entry': {
+                'connection_params': connection_params,
+                'saved_at': datetime.now().isoformat()
+            }
+        })
     
     def get_credentials(self, account: str, username: str) -> Optional[Dict[str, Any]]:
         """Retrieve connection parameters for account/username"""
-        if not self.storage_path.exists():
-            return None
-        
-        try:
-            encrypted = self.storage_path.read_bytes()
-            decrypted = self.cipher.decrypt(encrypted)
-            creds = json.loads(decrypted)
-            
-            if account in creds and username in creds[account]:
-                return creds[account][username]['connection_params']
-        except:
-            pass
-        
+        creds = self._load()
+        if account in creds and username in creds[account]:
+            return creds[account][username]['connection_params']
         return None
     
     def list_saved_credentials(self) -> Dict[str, List[str]]:
         """List all saved account/username combinations"""
-        if not self.storage_path.exists():
-            return {}
-        
-        try:
-            encrypted = self.storage_path.read_bytes()
-            decrypted = self.cipher.decrypt(encrypted)
-            creds = json.loads(decrypted)
-            
-            result = {}
-            for account, users in creds.items():
-                result[account] = list(users.keys())
-            return result
-        except:
-            return {}
+        return {account: list(users.keys()) for account, users in self._load().items()}
     
     def delete_credentials(self, account: Optional[str] = None, username: Optional[str] = None):
         """Delete saved credentials"""
-        if not self.storage_path.exists():
-            return
-        
         if account is None and username is None:
             # Delete all credentials
-            try:
-                self.storage_path.unlink()
-            except:
-                pass
+            for path in (self.storage_path, _LEGACY_CREDENTIALS_PATH):
+                path.unlink(missing_ok=True)
+            self._cache, self._cache_stamp = None, None
             return
         
         try:
-            encrypted = self.storage_path.read_bytes()
-            decrypted = self.cipher.decrypt(encrypted)
-            creds = json.loads(decrypted)
+            creds = self._load()
             
-            if account and account in creds:
-                if username:
-                    # Delete specific username
-                    creds[account].pop(username, None)
-                    if not creds[account]:
-                        creds.pop(account, None)
-                else:
-                    # Delete all users for account
-                    creds.pop(account, None)
+            # Delete a specific username, or all users for the account
+            if account and account in creds and (not username or username in creds[account]):
+                self._append(creds, {'op': 'del', 'account': account, 'user': username or None})
             
-            if creds:
-                encrypted = self.cipher.encrypt(json.dumps(creds).encode())
-                self.storage_path.write_bytes(encrypted)
-                try:
-                    os.chmod(self.storage_path, 0o600)
-                except:
-                    pass
-            else:
-                self.storage_path.unlink()
-        except:
-            pass
+            if not creds:
+                self.storage_path.unlink(missing_ok=True)
+                self._cache, self._cache_stamp = None, None
+        except OSError:
+            self._cache, self._cache_stamp = None, None
 
 
 class SnowflakeAuthClient:
@@ -147,6 +353,21 @@ class SnowflakeAuthClient:
         self.storage = SecureStorage()
         self.current_connection_params = None
         self._connection = None
+        # connect() bound to current_connection_params, built on first use
+        self._connect: Optional[partial] = None
+        # params hash -> (timestamp, ((account, user), result))
+        self._auth_cache: Dict[str, tuple] = {}
+        # params hash -> (timestamp, databases)
+        self._databases_cache: Dict[str, tuple] = {}
+        atexit.register(self.close)
+    
+    @staticmethod
+    def _cache_put(cache: Dict[str, tuple], key: str, value: Any):
+        """Store a timestamped result, evicting the oldest entry past AUTH_CACHE_MAX"""
+        cache.pop(key, None)
+        cache[key] = (time.monotonic(), value)
+        if len(cache) > AUTH_CACHE_MAX:
+            cache.pop(next(iter(cache)))
     
     @property
     def is_authenticated(self) -> bool:
@@ -155,20 +376,39 @@ class SnowflakeAuthClient:
     
     def test_authentication(self, connection_params: Dict[str, Any]) -> Dict[str, Any]:
         """Test if connection parameters are valid"""
+        key = _params_key(connection_params)
+        cached = self._auth_cache.get(key)
+        if cached:
+            ts, (_, result) = cached
+            if time.monotonic() - ts < (AUTH_TTL_OK if result['valid'] else AUTH_TTL_FAIL):
+                return dict(result)
+        login = (connection_params.get('account'), connection_params.get('user'))
+        # Different params for the same login (e.g. a new password) mean the
+        # cached result for the old ones can't be trusted anymore
+        self._forget_logins(*login, keep=key)
+        result = self._test_authentication(connection_params)
+        self._cache_put(self._auth_cache, key, (login, result))
+        return dict(result)
+    
+    def _forget_logins(self, account: Optional[str] = None, username: Optional[str] = None, keep: Optional[str] = None):
+        """Evict cached auth results (and pools) for an account/user, or for all logins"""
+        for key, (_, (login, _)) in list(self._auth_cache.items()):
+            if key != keep and _login_matches(login, account, username):
+                del self._auth_cache[key]
+                _drop_pool(key)
+    
+    def _test_authentication(self, connection_params: Dict[str, Any]) -> Dict[str, Any]:
+        connector = _connector()
         try:
-            # Create a test connection
-            conn = snowflake.connector.connect(**connection_params)
-            
-            # Get account and user info
-            cursor = conn.cursor()
-            cursor.execute("SELECT CURRENT_USER(), CURRENT_ACCOUNT(), CURRENT_ROLE(), CURRENT_WAREHOUSE()")
-            result = cursor.fetchone()
+            with _pooled_conn(connection_params) as conn:
+                # Get account and user info
+                cursor = conn.cursor()
+                cursor.execute("SELECT CURRENT_USER(), CURRENT_ACCOUNT(), CURRENT_ROLE(), CURRENT_WAREHOUSE()")
+                result = cursor.fetchone()
+                cursor.close()
             
             user, account, role, warehouse = result
             
-            cursor.close()
-            conn.close()
-            
             return {
                 'valid': True,
                 'user': user,
@@ -176,12 +416,14 @@ class SnowflakeAuthClient:
                 'role': role,
                 'warehouse': warehouse
             }
-        except snowflake.connector.errors.ProgrammingError as e:
+        except connector.errors.ProgrammingError as e:
+            _drop_pool(_params_key(connection_params))
             return {
                 'valid': False,
                 'error': f'Authentication failed: {str(e)}'
             }
         except Exception as e:
+            _drop_pool(_params_key(connection_params))
             return {
                 'valid': False,
                 'error': f'Connection error: {str(e)}'
@@ -189,34 +431,69 @@ class SnowflakeAuthClient:
     
     def discover_databases(self, connection_params: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Discover available databases"""
+        key = _params_key(connection_params)
+        cached = self._databases_cache.get(key)
+        if cached and time.monotonic() - cached[0] < DISCOVER_TTL:
+            return list(cached[1])
         try:
-            conn = snowflake.connector.connect(**connection_params)
-            cursor = conn.cursor()
+            if connection_params == self.current_connection_params:
+                databases = self._show_databases(self._get_connection())
+            else:
+                with _pooled_conn(connection_params) as conn:
+                    databases = self._show_databases(conn)
             
+            self._cache_put(self._databases_cache, key, databases)
+            return list(databases)
+        except Exception as e:
+            print(f"[SNOWFLAKE AUTH DEBUG] Failed to discover databases: {str(e)}")
+            return []
+    
+    @staticmethod
+    def _show_databases(conn) -> List[Dict[str, Any]]:
+        cursor = conn.cursor()
+        try:
             cursor.execute("SHOW DATABASES")
-            databases = []
-            for row in cursor:
-                databases.append({
+            return [
+                {
                     'name': row[1],  # database name
                     'owner': row[4],  # owner
                     'comment': row[6] if len(row) > 6 else ''  # comment
-                })
-            
+                }
+                for row in cursor
+            ]
+        finally:
             cursor.close()
-            conn.close()
-            
-            return databases
-        except Exception as e:
-            print(f"[SNOWFLAKE AUTH DEBUG] Failed to discover databases: {str(e)}")
-            return []
+    
+    def _get_connection(self):
+        """Return the long-lived connection for the current credentials, opening it if needed"""
+        if self._connection is not None and not self._connection.is_closed():
+            return self._connection
+        if self._connect is None:
+            self._connect = _make_connect(
+                self.current_connection_params, client_session_keep_alive_heartbeat_frequency=3600
+            )
+        self._connection = self._connect()
+        return self._connection
+    
+    def delete_credentials(self, account: Optional[str] = None, username: Optional[str] = None):
+        """Delete saved credentials, forgetting cached checks and pooled connections for them"""
+        self.storage.delete_credentials(account, username)
+        self._forget_logins(account, username)
+        _close_pools(account, username)
     
     def set_credentials(self, connection_params: Dict[str, Any]):
         """Set current connection parameters"""
+        if connection_params != self.current_connection_params:
+            # Credentials changed, the held connection belongs to the old ones
+            self.close()
+            self._connect = None
         self.current_connection_params = connection_params
-        # Clear any existing connection
+    
+    def close(self):
+        """Close the held connection"""
         if self._connection:
             try:
                 self._connection.close()
-            except:
+            except Exception:
                 pass
-            self._connection = None
\ No newline at end of file
+            self._connection = None
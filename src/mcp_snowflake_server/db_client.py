@@ -2,10 +2,9 @@ import asyncio
 import logging
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
-from snowflake.snowpark import Session
-
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -17,6 +16,9 @@ logger = logging.getLogger("mcp_snowflake_server")
 
 class SnowflakeDB:
     AUTH_EXPIRATION_TIME = 1800
+    # Statements run concurrently on the shared session; Snowflake's default
+    # per-warehouse concurrency is 8
+    MAX_CONCURRENT_QUERIES = 8
 
     def __init__(self, connection_config: dict):
         self.connection_config = connection_config
@@ -24,60 +26,66 @@ class SnowflakeDB:
         self.insights: list[str] = []
         self.auth_time = 0
         self.init_task = None  # To store the task reference
+        # Dedicated worker threads for blocking Snowpark calls, so concurrent
+        # queries neither queue behind nor starve the default executor
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.MAX_CONCURRENT_QUERIES, thread_name_prefix="snowflake-query"
+        )
+        # Whether SNOWFLAKE.ACCOUNT_USAGE is readable; probed on first use
+        self.account_usage_available: bool | None = None
 
     async def _init_database(self):
         """Initialize connection to the Snowflake database"""
         try:
-            # Create session without setting specific database and schema
-            self.session = Session.builder.configs(self.connection_config).create()
-
-            # Set initial warehouse if provided, but don't set database or schema
-            if "warehouse" in self.connection_config:
-                self.session.sql(f"USE WAREHOUSE {self.connection_config['warehouse'].upper()}")
-
+            # The login is a blocking network round trip; keep it off the event loop
+            self.session = await self._run_in_executor(self._create_session)
             self.auth_time = time.time()
         except Exception as e:
             raise ValueError(f"Failed to connect to Snowflake database: {e}")
 
+    def _create_session(self):
+        """Open a Snowpark session (blocking)"""
+        # Snowpark is imported on first connection to keep server startup fast
+        from snowflake.snowpark import Session
+
+        # Create session without setting specific database and schema
+        session = Session.builder.configs(self.connection_config).create()
+
+        # Set initial warehouse if provided, but don't set database or schema
+        if "warehouse" in self.connection_config:
+            session.sql(f"USE WAREHOUSE {self.connection_config['warehouse'].upper()}")
+
+        return session
+
     async def start_init_connection(self):
         """Start database initialization in the background"""
         # Create a task that runs in the background
         self.init_task = asyncio.create_task(self._init_database())
         return self.init_task
 
-    async def execute_query(self, query: str) -> tuple[list[dict[str, Any]], str]:
-        """Execute a SQL query and return results as a list of dictionaries"""
+    async def _ensure_session(self):
+        """Wait for a pending connection, or reconnect if the session is missing or expired"""
         # If init_task exists and isn't done, wait for it to complete
         if self.init_task and not self.init_task.done():
             await self.init_task
-        # If session doesn't exist or has expired, initialize it and wait
+        # If session doesn't exist or has expired, initialize it and wait. Going
+        # through init_task means concurrent callers share a single reconnect.
         elif not self.session or time.time() - self.auth_time > self.AUTH_EXPIRATION_TIME:
-            await self._init_database()
+            self.init_task = asyncio.create_task(self._init_database())
+            await self.init_task
+
+    async def execute_query(self, query: str, params: list[Any] | None = None) -> tuple[list[dict[str, Any]], str]:
+        """Execute a SQL query and return results as a list of dictionaries
+
+        ``params`` are bound server-side to ``?`` placeholders in ``query``.
+        The query itself runs on the query thread pool, so independent calls
+        can be awaited together with ``asyncio.gather`` and share the session.
+        """
+        await self._ensure_session()
 
         logger.debug(f"Executing query: {query}")
         try:
-            # Determine if this is a SELECT query or other statement
-            query_upper = query.strip().upper()
-            is_select = query_upper.startswith('SELECT')
-            
-            if is_select:
-                # For SELECT queries, use to_pandas()
-                result = self.session.sql(query).to_pandas()
-                result_rows = result.to_dict(orient="records")
-            else:
-                # For non-SELECT queries (SHOW, DESCRIBE, etc.), use collect()
-                rows = self.session.sql(query).collect()
-                
-                # Convert Row objects to dictionaries
-                result_rows = []
-                for row in rows:
-                    # Convert Row to dict - Row objects have as_dict() method
-                    if hasattr(row, 'as_dict'):
-                        result_rows.append(row.as_dict())
-                    else:
-                        # Fallback: convert using dict comprehension
-                        result_rows.append({col: getattr(row, col) for col in row._fields if hasattr(row, col)})
-            
+            result_rows = await self._run_in_executor(self._run_query, query, params)
             data_id = str(uuid.uuid4())
             return result_rows, data_id
 
@@ -85,6 +93,73 @@ class SnowflakeDB:
             logger.error(f'Database error executing "{query}": {e}')
             raise
 
+    def _run_in_executor(self, fn, *args):
+        """Run a blocking session call on the query thread pool"""
+        return asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _run_query(self, query: str, params: list[Any] | None) -> list[dict[str, Any]]:
+        """Run a query on the session (blocking) and convert rows to dictionaries"""
+        # Determine if this is a SELECT query (including WITH ... SELECT) or other statement
+        query_upper = query.lstrip().upper()
+        is_select = query_upper.startswith(('SELECT', 'WITH'))
+
+        if is_select:
+            # For SELECT queries, use to_pandas(); results are fetched as Arrow
+            # batches and converted column-wise rather than row by row
+            result = self.session.sql(query, params=params).to_pandas()
+            return result.to_dict(orient="records")
+
+        # For non-SELECT queries (SHOW, DESCRIBE, etc.), use collect()
+        return self._rows_as_dicts(self.session.sql(query, params=params).collect())
+
+    @staticmethod
+    def _rows_as_dicts(rows: list) -> list[dict[str, Any]]:
+        """Convert collect() rows to dictionaries"""
+        # Convert Row objects to dictionaries - Row objects have as_dict()
+        if rows and not hasattr(rows[0], 'as_dict'):
+            # Fallback: convert using the row's fields
+            return [{col: getattr(row, col) for col in row._fields if hasattr(row, col)} for row in rows]
+        return [row.as_dict() for row in rows]
+
+    async def execute_query_preview(
+        self, query: str, params: list[Any] | None, max_rows: int
+    ) -> tuple[list[dict[str, Any]], bool, str]:
+        """Execute a read query but only return its first ``max_rows`` rows
+
+        Returns ``(rows, truncated, query_id)``. The full result stays on the
+        Snowflake side and can be paged with ``RESULT_SCAN(query_id)``.
+        SELECT results are downloaded batch by batch until ``max_rows`` is
+        reached; other statements (SHOW, DESCRIBE, ...) are collected whole.
+        """
+        await self._ensure_session()
+
+        logger.debug(f"Executing query (preview of {max_rows} rows): {query}")
+        try:
+            return await self._run_in_executor(self._run_preview, query, params, max_rows)
+        except Exception as e:
+            logger.error(f'Database error executing "{query}": {e}')
+            raise
+
+    def _run_preview(
+        self, query: str, params: list[Any] | None, max_rows: int
+    ) -> tuple[list[dict[str, Any]], bool, str]:
+        """Stream result batches (blocking) until one row past ``max_rows`` is seen"""
+        if not query.lstrip().upper().startswith(('SELECT', 'WITH')):
+            # SHOW, DESCRIBE, etc. return JSON-format results that can't be
+            # fetched as pandas batches; collect them as rows like _run_query
+            job = self.session.sql(query, params=params).collect(block=False)
+            rows = self._rows_as_dicts(job.result())
+            return rows[:max_rows], len(rows) > max_rows, job.query_id
+
+        job = self.session.sql(query, params=params).collect_nowait()
+        rows: list[dict[str, Any]] = []
+        for batch in job.result("pandas_batches"):
+            # Only convert the rows still needed; a batch can hold far more
+            rows.extend(batch.head(max_rows + 1 - len(rows)).to_dict(orient="records"))
+            if len(rows) > max_rows:
+                break
+        return rows[:max_rows], len(rows) > max_rows, job.query_id
+
     def add_insight(self, insight: str) -> None:
         """Add a new insight to the collection"""
         self.insights.append(insight)
@@ -1,3 +1,5 @@
+import re
+
 import sqlparse
 from sqlparse.sql import Token, TokenList
 from sqlparse.tokens import Keyword, DML, DDL
@@ -16,6 +18,10 @@ class SQLWriteDetector:
         # Combine all write keywords
         self.write_keywords = self.dml_write_keywords | self.ddl_keywords | self.dcl_keywords
 
+        # Every write the parser can report needs one of the keywords somewhere
+        # in the text, so one scan for them lets most reads skip parsing
+        self._keyword_re = re.compile("|".join(sorted(self.write_keywords)), re.IGNORECASE)
+
     def analyze_query(self, sql_query: str) -> Dict:
         """
         Analyze a SQL query to determine if it contains write operations.
@@ -26,6 +32,9 @@ class SQLWriteDetector:
         Returns:
             Dictionary containing analysis results
         """
+        if not self._keyword_re.search(sql_query):
+            return {"contains_write": False, "write_operations": set(), "has_cte_write": False}
+
         # Parse the SQL query
         parsed = sqlparse.parse(sql_query)
         if not parsed:
@@ -4,12 +4,16 @@ TCP bridge for Snowflake MCP server.
 This allows the stdio-based MCP server to be accessed over TCP.
 """
 import asyncio
-import json
 import logging
 import os
+import socket
 import sys
 import subprocess
 from typing import Optional, Dict, Any
+from weakref import WeakSet
+
+# Read size for forwarding when messages aren't logged one by one
+FORWARD_CHUNK_SIZE = 64 * 1024
 
 # Configure logging
 logging.basicConfig(
@@ -19,70 +23,148 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+async def _terminate(process, timeout: float = 2.0):
+    """Stop an MCP server process, killing it if it ignores SIGTERM"""
+    if process.returncode is not None:
+        return
+    process.terminate()
+    try:
+        await asyncio.wait_for(process.wait(), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+
+
+class MCPWorkerPool:
+    """Pre-spawned MCP server processes, so clients don't wait for interpreter startup.
+    
+    Each worker serves a single client and is terminated afterwards (an MCP
+    session is stateful); the pool is topped back up in the background.
+    """
+    
+    def __init__(self, cmd: list, size: int = 2):
+        self.cmd = cmd
+        self.size = size
+        # Workers inherit the bridge's environment; copy it once, not per spawn
+        self.env = os.environ.copy()
+        self.idle: asyncio.Queue = asyncio.Queue()
+        self._refill_task: Optional[asyncio.Task] = None
+        
+    async def _spawn(self):
+        return await asyncio.create_subprocess_exec(
+            *self.cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            # Server stderr is only read to log it at INFO; otherwise discard it
+            stderr=subprocess.PIPE if logger.isEnabledFor(logging.INFO) else subprocess.DEVNULL,
+            env=self.env
+        )
+        
+    async def _refill(self):
+        while self.idle.qsize() < self.size:
+            self.idle.put_nowait(await self._spawn())
+            
+    def refill(self):
+        """Top the pool up in the background"""
+        if self.size > 0 and (self._refill_task is None or self._refill_task.done()):
+            self._refill_task = asyncio.create_task(self._refill())
+            
+    async def acquire(self):
+        """Take a running worker, spawning one directly if none are idle"""
+        process = None
+        while not self.idle.empty():
+            candidate = self.idle.get_nowait()
+            if candidate.returncode is None:
+                process = candidate
+                break
+        if process is None:
+            logger.info(f"Starting MCP server: {' '.join(self.cmd)}")
+            process = await self._spawn()
+        self.refill()
+        return process
+        
+    async def close(self):
+        """Terminate the idle workers"""
+        if self._refill_task:
+            self._refill_task.cancel()
+        while not self.idle.empty():
+            await _terminate(self.idle.get_nowait())
+
+
 class MCPServerBridge:
     """Bridge between TCP socket and stdio MCP server."""
     
-    def __init__(self, host: str = "0.0.0.0", port: int = 5001):
+    def __init__(self, host: str = "0.0.0.0", port: int = 5001, pool_size: int = 2):
         self.host = host
         self.port = port
         self.server = None
-        self.clients = set()
+        # Weak, so a writer whose handler never reached its cleanup can't be pinned here
+        self.clients = WeakSet()
+        self.pool = MCPWorkerPool([sys.executable, "server.py"], pool_size)
         
     async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
         """Handle a client connection."""
         client_addr = writer.get_extra_info('peername')
         logger.info(f"New client connected: {client_addr}")
+        # asyncio already disables Nagle on TCP sockets; keepalive lets the OS
+        # notice vanished peers, so their sessions don't linger
+        sock = writer.get_extra_info('socket')
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
         self.clients.add(writer)
         
         # Start MCP server process for this client
         process = None
         try:
-            # Start the MCP server
-            cmd = [sys.executable, "server.py"]
-            logger.info(f"Starting MCP server: {' '.join(cmd)}")
-            
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                env=os.environ.copy()
-            )
+            # Take a pre-started MCP server
+            process = await self.pool.acquire()
             
             # Create tasks for bidirectional communication
             tasks = [
                 asyncio.create_task(self._client_to_server(reader, process.stdin)),
-                asyncio.create_task(self._server_to_client(process.stdout, writer)),
-                asyncio.create_task(self._log_stderr(process.stderr))
+                asyncio.create_task(self._server_to_client(process.stdout, writer))
             ]
+            if process.stderr is not None:
+                tasks.append(asyncio.create_task(self._log_stderr(process.stderr)))
             
             # Wait for any task to complete
             done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
             
-            # Cancel remaining tasks
+            # Cancel remaining tasks and wait for them to unwind, so none is
+            # still touching the worker's pipes when it is terminated
             for task in pending:
                 task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
                 
+        except asyncio.CancelledError:
+            logger.info(f"Client handler cancelled: {client_addr}")
+            raise
         except Exception as e:
             logger.error(f"Error handling client: {e}")
         finally:
-            # Clean up
+            # Clean up; the worker is stopped before any other await and is
+            # shielded, so a second cancellation can't leak it
             self.clients.discard(writer)
             writer.close()
-            await writer.wait_closed()
-            
             if process:
-                process.terminate()
-                await process.wait()
+                await asyncio.shield(_terminate(process))
+                
+            await writer.wait_closed()
                 
             logger.info(f"Client disconnected: {client_addr}")
             
     async def _client_to_server(self, reader: asyncio.StreamReader, server_stdin):
         """Forward messages from client to server."""
         try:
+            # Line framing is only needed to log individual messages; otherwise
+            # forward whatever has arrived, in large chunks
+            log_messages = logger.isEnabledFor(logging.INFO)
             while True:
-                # Read line from client
-                data = await reader.readline()
+                # Read from client
+                if log_messages:
+                    data = await reader.readline()
+                else:
+                    data = await reader.read(FORWARD_CHUNK_SIZE)
                 if not data:
                     break
                     
@@ -90,12 +172,10 @@ class MCPServerBridge:
                 server_stdin.write(data)
                 await server_stdin.drain()
                 
-                # Log the message
-                try:
-                    msg = json.loads(data.decode().strip())
-                    logger.info(f"Client -> Server: {json.dumps(msg)}")
-                except:
-                    pass
+                # Log the message; the line is already JSON, so it is logged
+                # as-is rather than parsed and re-serialized
+                if log_messages:
+                    logger.info("Client -> Server: %s", data.rstrip().decode(errors="replace"))
                     
         except Exception as e:
             logger.error(f"Error in client_to_server: {e}")
@@ -103,9 +183,15 @@ class MCPServerBridge:
     async def _server_to_client(self, server_stdout, writer: asyncio.StreamWriter):
         """Forward messages from server to client."""
         try:
+            # Line framing is only needed to log individual messages; otherwise
+            # forward whatever has arrived, in large chunks
+            log_messages = logger.isEnabledFor(logging.INFO)
             while True:
-                # Read line from server
-                data = await server_stdout.readline()
+                # Read from server
+                if log_messages:
+                    data = await server_stdout.readline()
+                else:
+                    data = await server_stdout.read(FORWARD_CHUNK_SIZE)
                 if not data:
                     break
                     
@@ -113,12 +199,10 @@ class MCPServerBridge:
                 writer.write(data)
                 await writer.drain()
                 
-                # Log the message
-                try:
-                    msg = json.loads(data.decode().strip())
-                    logger.info(f"Server -> Client: {json.dumps(msg)}")
-                except:
-                    pass
+                # Log the message; the line is already JSON, so it is logged
+                # as-is rather than parsed and re-serialized
+                if log_messages:
+                    logger.info("Server -> Client: %s", data.rstrip().decode(errors="replace"))
                     
         except Exception as e:
             logger.error(f"Error in server_to_client: {e}")
@@ -130,7 +214,8 @@ class MCPServerBridge:
                 line = await stderr.readline()
                 if not line:
                     break
-                logger.info(f"MCP Server: {line.decode().strip()}")
+                # The server's output may not be valid UTF-8; don't let that stop the logger
+                logger.info("MCP Server: %s", line.rstrip().decode(errors="replace"))
         except Exception as e:
             logger.error(f"Error reading stderr: {e}")
             
@@ -139,22 +224,33 @@ class MCPServerBridge:
         self.server = await asyncio.start_server(
             self.handle_client, self.host, self.port
         )
+        self.pool.refill()
         
         addr = self.server.sockets[0].getsockname()
         logger.info(f"TCP bridge listening on {addr[0]}:{addr[1]}")
         
-        async with self.server:
-            await self.server.serve_forever()
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            await self.pool.close()
 
 
 async def main():
     """Run the TCP bridge."""
     host = os.getenv("TCP_HOST", "0.0.0.0")
     port = int(os.getenv("TCP_PORT", "5001"))
+    pool_size = int(os.getenv("MCP_POOL_SIZE", "2"))
     
-    bridge = MCPServerBridge(host, port)
+    bridge = MCPServerBridge(host, port, pool_size)
     await bridge.start()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    # uvloop is optional (the "speedups" extra) and not available on Windows
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
\ No newline at end of file
@@ -7,8 +7,10 @@ import asyncio
 import json
 import logging
 import os
+import socket
 import sys
-from typing import Dict, Any, Set
+from typing import Dict, Any
+from weakref import WeakSet
 
 # Add the src directory to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
@@ -25,18 +27,28 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# Longest JSON-RPC line a client may send; the StreamReader default is 64 KiB
+MAX_MESSAGE_SIZE = 8 * 1024 * 1024
+
+
 class MCPTCPServer:
     """TCP server wrapper for MCP."""
     
     def __init__(self, host: str = "0.0.0.0", port: int = 8765):
         self.host = host
         self.port = port
-        self.clients: Set[asyncio.StreamWriter] = set()
+        # Weak, so a writer whose handler never reached its cleanup can't be pinned here
+        self.clients: WeakSet = WeakSet()
         
     async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
         """Handle a TCP client connection."""
         client_addr = writer.get_extra_info('peername')
         logger.info(f"New client connected from {client_addr}")
+        # asyncio already disables Nagle on TCP sockets; keepalive lets the OS
+        # notice vanished peers, so their sessions don't linger
+        sock = writer.get_extra_info('socket')
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
         self.clients.add(writer)
         
         try:
@@ -83,7 +95,7 @@ class MCPTCPServer:
     async def start(self):
         """Start the TCP server."""
         server = await asyncio.start_server(
-            self.handle_client, self.host, self.port
+            self.handle_client, self.host, self.port, limit=MAX_MESSAGE_SIZE
         )
         
         addr = server.sockets[0].getsockname()
@@ -98,25 +110,15 @@ class MCPStreamAdapter:
     
     def __init__(self, stream):
         self.stream = stream
-        self._buffer = b""
         
     async def readline(self) -> bytes:
         """Read a line from the stream."""
         if isinstance(self.stream, asyncio.StreamReader):
-            # Reading from client
-            while b'\n' not in self._buffer:
-                data = await self.stream.read(1024)
-                if not data:
-                    break
-                self._buffer += data
-                
-            if b'\n' in self._buffer:
-                line, self._buffer = self._buffer.split(b'\n', 1)
-                return line + b'\n'
-            else:
-                line = self._buffer
-                self._buffer = b""
-                return line
+            # Reading from client; at EOF, return whatever is left
+            try:
+                return await self.stream.readuntil(b'\n')
+            except asyncio.IncompleteReadError as e:
+                return e.partial
         else:
             # Should not be called for writer
             raise NotImplementedError()
@@ -144,4 +146,10 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    # uvloop is optional (the "speedups" extra) and not available on Windows
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
\ No newline at end of file
@@ -3,8 +3,13 @@
 
 import sys
 import os
+import tempfile
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src/mcp_snowflake_server'))
 
+# Keep test credentials out of ~/.snowflake-mcp; must be set before auth is imported
+_STORAGE_DIR = tempfile.TemporaryDirectory(prefix='snowflake-mcp-test-')
+os.environ['SNOWFLAKE_MCP_HOME'] = _STORAGE_DIR.name
+
 from auth import SecureStorage, SnowflakeAuthClient
 
 def test_secure_storage():
@@ -69,13 +74,80 @@ def test_auth_client():
     
     print("\nAll SnowflakeAuthClient tests passed! ✓")
 
+def test_deleted_credentials_leave_log():
+    """Test that deleted or replaced credentials don't stay in the raw log"""
+    print("\nTesting credential removal from the log...")
+    
+    storage = SecureStorage()
+    
+    print("1. Saving two users...")
+    storage.save_credentials('test_account', 'old_user', {'user': 'old_user', 'password': 'old_password'})
+    old_user_record = storage.storage_path.read_bytes().splitlines()[-1]
+    storage.save_credentials('test_account', 'kept_user', {'user': 'kept_user', 'password': 'first_password'})
+    first_password_record = storage.storage_path.read_bytes().splitlines()[-1]
+    print("   ✓ Credentials saved")
+    
+    print("2. Deleting one user...")
+    storage.delete_credentials('test_account', 'old_user')
+    assert old_user_record not in storage.storage_path.read_bytes(), "Deleted credentials are still in the log"
+    assert storage.get_credentials('test_account', 'old_user') is None, "Credentials were not deleted"
+    print("   ✓ Deleted user's record is gone from the log")
+    
+    print("3. Replacing the other user's password...")
+    storage.save_credentials('test_account', 'kept_user', {'user': 'kept_user', 'password': 'second_password'})
+    assert first_password_record not in storage.storage_path.read_bytes(), "Replaced credentials are still in the log"
+    retrieved = SecureStorage().get_credentials('test_account', 'kept_user')
+    assert retrieved == {'user': 'kept_user', 'password': 'second_password'}, "Replaced credentials don't match"
+    print("   ✓ Old password's record is gone from the log")
+    
+    storage.delete_credentials()
+    print("\nAll credential removal tests passed! ✓")
+
+def test_auth_cache_eviction():
+    """Test that cached authentication results don't outlive deleted or replaced credentials"""
+    print("\nTesting authentication cache eviction...")
+    
+    client = SnowflakeAuthClient()
+    checks = []
+    
+    def fake_check(connection_params):
+        checks.append(connection_params['password'])
+        return {'valid': True}
+    
+    client._test_authentication = fake_check
+    old_params = {'account': 'test_account', 'user': 'test_user', 'password': 'old_password'}
+    new_params = {'account': 'test_account', 'user': 'test_user', 'password': 'new_password'}
+    
+    print("1. Checking the same credentials twice...")
+    client.test_authentication(old_params)
+    client.test_authentication(old_params)
+    assert checks == ['old_password'], "Second check should come from the cache"
+    print("   ✓ Successful check cached")
+    
+    print("2. Deleting the credentials...")
+    client.delete_credentials('test_account', 'test_user')
+    client.test_authentication(old_params)
+    assert checks == ['old_password', 'old_password'], "Deleted credentials should be checked again"
+    print("   ✓ Cached check evicted on delete")
+    
+    print("3. Changing the password...")
+    client.test_authentication(new_params)
+    client.test_authentication(old_params)
+    assert checks == ['old_password', 'old_password', 'new_password', 'old_password'], \
+        "Old password should be checked again after a new one was used"
+    print("   ✓ Cached check evicted on password change")
+    
+    print("\nAll authentication cache tests passed! ✓")
+
 if __name__ == "__main__":
     print("Running Snowflake MCP Authentication Tests\n")
     print("=" * 50)
     
     try:
         test_secure_storage()
+        test_deleted_credentials_leave_log()
         test_auth_client()
+        test_auth_cache_eviction()
         print("\n" + "=" * 50)
         print("All tests passed! ✓✓✓")
     except Exception as e:
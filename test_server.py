@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Test script for Snowflake MCP server tools, run against a fake Snowpark session"""
+
+import sys
+import os
+import time
+import asyncio
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Keep test credentials out of ~/.snowflake-mcp; must be set before server is imported
+_STORAGE_DIR = tempfile.TemporaryDirectory(prefix='snowflake-mcp-test-')
+os.environ['SNOWFLAKE_MCP_HOME'] = _STORAGE_DIR.name
+
+import server
+from mcp_snowflake_server.db_client import SnowflakeDB
+
+class FakeRow:
+    """Stands in for snowflake.snowpark.Row"""
+
+    def __init__(self, **values):
+        self._values = values
+
+    def as_dict(self):
+        return dict(self._values)
+
+class FakeJob:
+    """Stands in for snowflake.snowpark.AsyncJob of a SHOW/DESCRIBE statement"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.query_id = 'query-1'
+
+    def result(self, result_type='row'):
+        if result_type == 'row':
+            return [FakeRow(**row) for row in self.rows]
+        # SHOW/DESCRIBE results come back as JSON, not Arrow
+        raise RuntimeError('result is not in Arrow format')
+
+class FakePandasFrame:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def to_dict(self, orient):
+        return [dict(row) for row in self.rows]
+
+class FakeDataFrame:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def collect(self, block=True):
+        job = FakeJob(self.rows)
+        return job.result() if block else job
+
+    def collect_nowait(self):
+        return FakeJob(self.rows)
+
+    def to_pandas(self):
+        return FakePandasFrame(self.rows)
+
+class FakeSession:
+    """Answers each query with the rows registered for the first key it contains"""
+
+    def __init__(self, results):
+        self.results = results
+        self.queries = []
+
+    def sql(self, query, params=None):
+        self.queries.append((query, params))
+        for key, rows in self.results.items():
+            if key in query:
+                return FakeDataFrame(rows)
+        raise AssertionError(f"Unexpected query: {query}")
+
+def _use_fake_db(results):
+    """Point the server at a SnowflakeDB backed by a FakeSession"""
+    fake_db = SnowflakeDB({})
+    fake_db.session = FakeSession(results)
+    fake_db.auth_time = time.time()
+    server.db = fake_db
+    return fake_db
+
+def test_read_query_show():
+    """Test that read_query handles SHOW statements, whose results aren't Arrow"""
+    print("Testing read_query with SHOW...")
+
+    _use_fake_db({
+        'SHOW TABLES': [{'name': 'ORDERS'}, {'name': 'CUSTOMERS'}, {'name': 'ITEMS'}]
+    })
+    try:
+        print("1. Running SHOW TABLES...")
+        result = asyncio.run(server.read_query('SHOW TABLES'))
+        assert result['success'], f"read_query failed: {result}"
+        assert result['data'] == [{'name': 'ORDERS'}, {'name': 'CUSTOMERS'}, {'name': 'ITEMS'}]
+        assert not result['truncated'], "Result should not be truncated"
+        print("   ✓ All rows returned")
+
+        print("2. Running SHOW TABLES with max_rows=2...")
+        result = asyncio.run(server.read_query('SHOW TABLES', max_rows=2))
+        assert result['success'], f"read_query failed: {result}"
+        assert result['row_count'] == 2, "Result should be capped at max_rows"
+        assert result['truncated'], "Result should be marked truncated"
+        assert result['data_id'] == 'query-1', "data_id should be the query id"
+        print("   ✓ Result capped and pageable")
+    finally:
+        server.db = None
+
+    print("\nAll read_query tests passed! ✓")
+
+def test_cortex_analyst_plain_text():
+    """Test that cortex_analyst returns the model's text, not COMPLETE's JSON envelope"""
+    print("\nTesting cortex_analyst with execute_sql=false...")
+
+    envelope = '{"choices": [{"messages": "Orders grew 5% last month."}], "usage": {"total_tokens": 42}}'
+    fake_db = _use_fake_db({'SNOWFLAKE.CORTEX.COMPLETE': [{'RESPONSE': envelope}]})
+    try:
+        print("1. Asking a question...")
+        result = asyncio.run(server.cortex_analyst('How did orders change?', execute_sql=False))
+        assert result['success'], f"cortex_analyst failed: {result}"
+        assert result['response'] == 'Orders grew 5% last month.', f"Unexpected response: {result['response']}"
+        print("   ✓ Plain text returned")
+
+        query, params = fake_db.session.queries[-1]
+        assert "'max_tokens': 4096" in query, "COMPLETE options should still be passed"
+        assert params[0] == 'mistral-large2', "Model should be bound as a parameter"
+        print("   ✓ Options and model passed to COMPLETE")
+    finally:
+        server.db = None
+
+    print("\nAll cortex_analyst tests passed! ✓")
+
+if __name__ == "__main__":
+    print("Running Snowflake MCP Server Tests\n")
+    print("=" * 50)
+
+    try:
+        test_read_query_show()
+        test_cortex_analyst_plain_text()
+        print("\n" + "=" * 50)
+        print("All tests passed! ✓✓✓")
+    except Exception as e:
+        print(f"\nTest failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
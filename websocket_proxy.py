@@ -14,6 +14,19 @@ import uvicorn
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 
+# orjson is optional; fall back to the stdlib json module when it's missing.
+# Both accept bytes, so forwarded lines are parsed without decoding first.
+try:
+    import orjson
+
+    _loads = orjson.loads
+    _dumps_bytes = orjson.dumps
+except ImportError:
+    _loads = json.loads
+
+    def _dumps_bytes(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -33,6 +46,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# The MCP server runs as a module from the src directory, so PYTHONPATH has to
+# include it. The environment is the same for every connection; build it once.
+_SRC_DIR = os.path.join(os.path.dirname(__file__), 'src')
+_SERVER_ENV = {**os.environ, 'PYTHONPATH': _SRC_DIR + ':' + os.environ.get('PYTHONPATH', '')}
+
 class MCPServerProxy:
     """Proxy for stdio-based MCP server."""
     
@@ -43,31 +61,25 @@ class MCPServerProxy:
         
     async def start(self):
         """Start the MCP server process."""
-        # Set up environment
-        env = os.environ.copy()
-        
-        # Start the MCP server
-        # Change to src directory and run the module
-        src_dir = os.path.join(os.path.dirname(__file__), 'src')
-        # Set PYTHONPATH to include src directory
-        env['PYTHONPATH'] = src_dir + ':' + env.get('PYTHONPATH', '')
         cmd = [sys.executable, "-m", "mcp_snowflake_server"]
-        logger.info(f"Starting MCP server: {' '.join(cmd)} in {src_dir}")
+        logger.info(f"Starting MCP server: {' '.join(cmd)} in {_SRC_DIR}")
         
         self.process = await asyncio.create_subprocess_exec(
             *cmd,
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            env=env,
-            cwd=src_dir
+            # Server stderr is only read to log it at INFO; otherwise discard it
+            stderr=subprocess.PIPE if logger.isEnabledFor(logging.INFO) else subprocess.DEVNULL,
+            env=_SERVER_ENV,
+            cwd=_SRC_DIR
         )
         
         self.reader = self.process.stdout
         self.writer = self.process.stdin
         
         # Start error logger
-        asyncio.create_task(self._log_stderr())
+        if self.process.stderr is not None:
+            asyncio.create_task(self._log_stderr())
         
     async def _log_stderr(self):
         """Log stderr output from the MCP server."""
@@ -75,13 +87,18 @@ class MCPServerProxy:
             line = await self.process.stderr.readline()
             if not line:
                 break
-            logger.info(f"MCP Server: {line.decode().strip()}")
+            # The server's output may not be valid UTF-8; don't let that stop the logger
+            logger.info("MCP Server: %s", line.rstrip().decode(errors="replace"))
                 
     async def send_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """Send a request to the MCP server and get response."""
+        return _loads(await self.send_raw(_dumps_bytes(request)))
+        
+    async def send_raw(self, payload: bytes) -> bytes:
+        """Send one serialized message (without newline) and return the raw response line."""
         # Send request
-        request_str = json.dumps(request) + '\n'
-        self.writer.write(request_str.encode())
+        self.writer.write(payload)
+        self.writer.write(b'\n')
         await self.writer.drain()
         
         # Read response
@@ -89,7 +106,7 @@ class MCPServerProxy:
         if not response_line:
             raise Exception("MCP server closed")
             
-        return json.loads(response_line.decode())
+        return response_line.rstrip(b'\n')
         
     async def close(self):
         """Close the MCP server."""
@@ -97,6 +114,14 @@ class MCPServerProxy:
             self.process.terminate()
             await self.process.wait()
 
+async def _receive_frame(websocket: WebSocket) -> bytes:
+    """Receive one frame as bytes, accepting both text and binary frames."""
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    data = message.get("bytes")
+    return data if data is not None else message["text"].encode()
+
 @app.websocket("/mcp")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for MCP communication."""
@@ -113,21 +138,28 @@ async def websocket_endpoint(websocket: WebSocket):
         while True:
             # Receive message from WebSocket
             try:
-                message = await websocket.receive_json()
-                logger.info(f"Received: {message}")
+                raw = await _receive_frame(websocket)
+                # Parsed only to validate (and log) it; the frame itself is forwarded
+                message = _loads(raw)
+                logger.info("Received: %s", message)
+                
+                # The MCP server reads one message per line, so pretty-printed
+                # frames have to be re-serialized onto a single line
+                if b'\n' in raw:
+                    raw = _dumps_bytes(message)
                 
                 # Forward to MCP server
-                response = await server.send_request(message)
+                response = (await server.send_raw(raw)).decode()
                 
-                # Send response back
-                await websocket.send_json(response)
-                logger.info(f"Sent: {response}")
+                # Send response back as-is
+                await websocket.send_text(response)
+                logger.info("Sent: %s", response)
                 
             except WebSocketDisconnect:
                 logger.info("WebSocket client disconnected")
                 break
             except json.JSONDecodeError as e:
-                logger.error(f"Invalid JSON: {e}")
+                logger.error("Invalid JSON: %s", e)
                 await websocket.send_json({
                     "jsonrpc": "2.0",
                     "error": {
@@ -152,6 +184,9 @@ async def main():
     """Run the WebSocket server."""
     host = os.getenv("WS_HOST", "0.0.0.0")
     port = int(os.getenv("WS_PORT", "8765"))
+    # permessage-deflate trades CPU on every frame for bandwidth; turn it off
+    # when clients are close by and most messages are small
+    per_message_deflate = os.getenv("WS_PER_MESSAGE_DEFLATE", "true").lower() == "true"
     
     logger.info(f"Starting Snowflake MCP WebSocket proxy on {host}:{port}")
     
@@ -159,10 +194,17 @@ async def main():
         app,
         host=host,
         port=port,
-        log_level="info"
+        log_level="info",
+        ws_per_message_deflate=per_message_deflate
     )
     server = uvicorn.Server(config)
     await server.serve()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    # uvloop is optional (the "speedups" extra) and not available on Windows
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
\ No newline at end of file
@@ -13,6 +13,19 @@ import uvicorn
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 
+# orjson is optional; fall back to the stdlib json module when it's missing.
+# Both accept bytes, so frames are parsed without decoding first.
+try:
+    import orjson
+
+    _loads = orjson.loads
+    _dumps_bytes = orjson.dumps
+except ImportError:
+    _loads = json.loads
+
+    def _dumps_bytes(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+
 # Add parent directories to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
@@ -36,6 +49,110 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Static protocol payloads, built once at import
+_INIT_RESULT = {
+    "protocolVersion": "0.1.0",
+    "capabilities": {
+        "tools": {},
+        "prompts": {},
+        "resources": {}
+    },
+    "serverInfo": {
+        "name": "snowflake-mcp",
+        "version": "0.1.0"
+    }
+}
+
+# Tools that work before authentication and receive the auth client
+_AUTH_TOOLS = frozenset({
+    "authenticate_snowflake",
+    "use_saved_credentials",
+    "list_saved_credentials",
+    "delete_saved_credentials"
+})
+
+_TOOL_DESCRIPTIONS = {
+    "authenticate_snowflake": "Authenticate with Snowflake using connection parameters",
+    "use_saved_credentials": "Use previously saved Snowflake credentials",
+    "list_saved_credentials": "List all saved Snowflake credentials",
+    "delete_saved_credentials": "Delete saved Snowflake credentials",
+    "list_databases": "List all available databases in Snowflake",
+    "list_schemas": "List all schemas in a database",
+    "list_tables": "List all tables in a specific database and schema",
+    "describe_table": "Get the schema information for a specific table",
+    "read_query": "Execute a SELECT query"
+}
+
+_EMPTY_SCHEMA = {"type": "object", "properties": {}}
+
+_TOOL_SCHEMAS = {
+    "authenticate_snowflake": {
+        "type": "object",
+        "properties": {
+            "account": {"type": "string", "description": "Snowflake account identifier"},
+            "user": {"type": "string", "description": "Snowflake username"},
+            "password": {"type": "string", "description": "Snowflake password"},
+            "warehouse": {"type": "string", "description": "Warehouse to use (optional)"},
+            "database": {"type": "string", "description": "Default database (optional)"},
+            "schema": {"type": "string", "description": "Default schema (optional)"},
+            "role": {"type": "string", "description": "Role to use (optional)"}
+        },
+        "required": ["account", "user", "password"]
+    },
+    "use_saved_credentials": {
+        "type": "object",
+        "properties": {
+            "account": {"type": "string", "description": "Snowflake account identifier"},
+            "user": {"type": "string", "description": "Snowflake username"}
+        },
+        "required": ["account", "user"]
+    },
+    "list_saved_credentials": {
+        "type": "object",
+        "properties": {}
+    },
+    "delete_saved_credentials": {
+        "type": "object",
+        "properties": {
+            "account": {"type": "string", "description": "Snowflake account identifier"},
+            "user": {"type": "string", "description": "Snowflake username"}
+        }
+    },
+    "list_databases": {
+        "type": "object",
+        "properties": {}
+    },
+    "list_schemas": {
+        "type": "object",
+        "properties": {
+            "database": {"type": "string", "description": "Database name"}
+        },
+        "required": ["database"]
+    },
+    "list_tables": {
+        "type": "object",
+        "properties": {
+            "database": {"type": "string", "description": "Database name"},
+            "schema": {"type": "string", "description": "Schema name"}
+        },
+        "required": ["database", "schema"]
+    },
+    "describe_table": {
+        "type": "object",
+        "properties": {
+            "table_name": {"type": "string", "description": "Fully qualified table name"}
+        },
+        "required": ["table_name"]
+    },
+    "read_query": {
+        "type": "object",
+        "properties": {
+            "query": {"type": "string", "description": "SELECT SQL query to execute"}
+        },
+        "required": ["query"]
+    }
+}
+
 class MCPWebSocketHandler:
     """Handler for MCP over WebSocket."""
     
@@ -45,13 +162,26 @@ class MCPWebSocketHandler:
         self.auth_client = None
         self.write_detector = None
         self.allowed_tools = []
+        self._tools_list_result = None
         self._initialized = False
+        self._init_lock = asyncio.Lock()
+        # JSON-RPC method -> coroutine taking the request params
+        self._method_handlers = {
+            "initialize": self._handle_initialize,
+            "tools/list": self._handle_list_tools,
+            "tools/call": self._handle_call_tool
+        }
         
     async def initialize_server(self):
         """Initialize the MCP server components."""
         if self._initialized:
             return
-            
+        # Requests are handled concurrently; the first ones share one initialization
+        async with self._init_lock:
+            if not self._initialized:
+                await self._initialize_server()
+                
+    async def _initialize_server(self):
         try:
             # Import required modules
             from mcp_snowflake_server.server import (
@@ -110,6 +240,18 @@ class MCPWebSocketHandler:
                 "read_query": handle_read_query
             }
             
+            # tools/list is static once the handlers are known; build it once
+            self._tools_list_result = {
+                "tools": [
+                    {
+                        "name": name,
+                        "description": self._get_tool_description(name),
+                        "inputSchema": self._get_tool_schema(name)
+                    }
+                    for name in self.tool_handlers
+                ]
+            }
+            
             self._initialized = True
             logger.info("MCP server components initialized")
             
@@ -123,102 +265,31 @@ class MCPWebSocketHandler:
             
     async def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """Handle a JSON-RPC request."""
-        method = request.get("method")
-        params = request.get("params", {})
-        request_id = request.get("id")
-        
+        request_id = None
         try:
+            # Valid JSON that isn't an object ([], 1, "x") is not a request
+            if not isinstance(request, dict):
+                return {
+                    "jsonrpc": "2.0",
+                    "error": {
+                        "code": -32600,
+                        "message": "Invalid Request"
+                    },
+                    "id": None
+                }
+            method = request.get("method")
+            params = request.get("params", {})
+            request_id = request.get("id")
+            
             # Initialize server if needed
             if not self._initialized:
                 await self.initialize_server()
             
-            # Handle different methods
-            if method == "initialize":
-                # MCP initialization
-                result = {
-                    "protocolVersion": "0.1.0",
-                    "capabilities": {
-                        "tools": {},
-                        "prompts": {},
-                        "resources": {}
-                    },
-                    "serverInfo": {
-                        "name": "snowflake-mcp",
-                        "version": "0.1.0"
-                    }
-                }
-                
-            elif method == "tools/list":
-                # List available tools
-                tools = []
-                for name in self.tool_handlers.keys():
-                    tool_info = {
-                        "name": name,
-                        "description": self._get_tool_description(name),
-                        "inputSchema": self._get_tool_schema(name)
-                    }
-                    tools.append(tool_info)
-                result = {"tools": tools}
-                
-            elif method == "tools/call":
-                # Call a tool
-                tool_name = params.get("name")
-                arguments = params.get("arguments", {})
-                
-                handler = self.tool_handlers.get(tool_name)
-                if not handler:
-                    raise ValueError(f"Unknown tool: {tool_name}")
-                
-                # Check if db is None for non-auth tools
-                if self.db is None and tool_name not in ["authenticate_snowflake", "use_saved_credentials", "list_saved_credentials", "delete_saved_credentials"]:
-                    result = {
-                        "content": [{
-                            "type": "text",
-                            "text": "Not authenticated. Please use 'authenticate_snowflake' tool first."
-                        }]
-                    }
-                else:
-                    # Call the tool handler
-                    if tool_name in ["authenticate_snowflake", "use_saved_credentials", "list_saved_credentials", "delete_saved_credentials"]:
-                        # Authentication tools
-                        content = await handler(
-                            arguments,
-                            self.db,
-                            self.write_detector,
-                            False,  # allow_write
-                            self.server,
-                            auth_client=self.auth_client,
-                            db_setter=self.set_db
-                        )
-                    else:
-                        # Other tools
-                        content = await handler(
-                            arguments,
-                            self.db,
-                            self.write_detector,
-                            False,  # allow_write
-                            self.server
-                        )
-                    
-                    # Convert content to result format
-                    result = {
-                        "content": []
-                    }
-                    for item in content:
-                        if hasattr(item, 'type') and item.type == 'text':
-                            result["content"].append({
-                                "type": "text",
-                                "text": item.text
-                            })
-                        elif hasattr(item, 'type') and item.type == 'resource':
-                            # Handle embedded resources
-                            result["content"].append({
-                                "type": "text",
-                                "text": item.resource.text
-                            })
-                
-            else:
+            # Dispatch on the method
+            method_handler = self._method_handlers.get(method)
+            if method_handler is None:
                 raise ValueError(f"Unknown method: {method}")
+            result = await method_handler(params)
                 
             # Return success response
             return {
@@ -228,7 +299,7 @@ class MCPWebSocketHandler:
             }
             
         except Exception as e:
-            logger.error(f"Error handling request: {e}", exc_info=True)
+            logger.error("Error handling request: %s", e, exc_info=True)
             return {
                 "jsonrpc": "2.0",
                 "error": {
@@ -238,121 +309,130 @@ class MCPWebSocketHandler:
                 "id": request_id
             }
             
+    async def _handle_initialize(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """MCP initialization."""
+        return _INIT_RESULT
+        
+    async def _handle_list_tools(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """List available tools."""
+        return self._tools_list_result
+        
+    async def _handle_call_tool(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Call a tool."""
+        tool_name = params.get("name")
+        arguments = params.get("arguments", {})
+        
+        handler = self.tool_handlers.get(tool_name)
+        if not handler:
+            raise ValueError(f"Unknown tool: {tool_name}")
+        
+        # Check if db is None for non-auth tools
+        if self.db is None and tool_name not in _AUTH_TOOLS:
+            return {
+                "content": [{
+                    "type": "text",
+                    "text": "Not authenticated. Please use 'authenticate_snowflake' tool first."
+                }]
+            }
+        
+        # Call the tool handler
+        if tool_name in _AUTH_TOOLS:
+            # Authentication tools
+            content = await handler(
+                arguments,
+                self.db,
+                self.write_detector,
+                False,  # allow_write
+                self.server,
+                auth_client=self.auth_client,
+                db_setter=self.set_db
+            )
+        else:
+            # Other tools
+            content = await handler(
+                arguments,
+                self.db,
+                self.write_detector,
+                False,  # allow_write
+                self.server
+            )
+        
+        # Convert content to result format; embedded resources become text
+        return {
+            "content": [
+                {
+                    "type": "text",
+                    "text": item.text if item_type == 'text' else item.resource.text
+                }
+                for item in content
+                if (item_type := getattr(item, 'type', None)) in ('text', 'resource')
+            ]
+        }
+            
     def _get_tool_description(self, tool_name: str) -> str:
         """Get description for a tool."""
-        descriptions = {
-            "authenticate_snowflake": "Authenticate with Snowflake using connection parameters",
-            "use_saved_credentials": "Use previously saved Snowflake credentials",
-            "list_saved_credentials": "List all saved Snowflake credentials",
-            "delete_saved_credentials": "Delete saved Snowflake credentials",
-            "list_databases": "List all available databases in Snowflake",
-            "list_schemas": "List all schemas in a database",
-            "list_tables": "List all tables in a specific database and schema",
-            "describe_table": "Get the schema information for a specific table",
-            "read_query": "Execute a SELECT query"
-        }
-        return descriptions.get(tool_name, f"Tool: {tool_name}")
+        return _TOOL_DESCRIPTIONS.get(tool_name, f"Tool: {tool_name}")
         
     def _get_tool_schema(self, tool_name: str) -> Dict[str, Any]:
         """Get input schema for a tool."""
-        schemas = {
-            "authenticate_snowflake": {
-                "type": "object",
-                "properties": {
-                    "account": {"type": "string", "description": "Snowflake account identifier"},
-                    "user": {"type": "string", "description": "Snowflake username"},
-                    "password": {"type": "string", "description": "Snowflake password"},
-                    "warehouse": {"type": "string", "description": "Warehouse to use (optional)"},
-                    "database": {"type": "string", "description": "Default database (optional)"},
-                    "schema": {"type": "string", "description": "Default schema (optional)"},
-                    "role": {"type": "string", "description": "Role to use (optional)"}
-                },
-                "required": ["account", "user", "password"]
-            },
-            "use_saved_credentials": {
-                "type": "object",
-                "properties": {
-                    "account": {"type": "string", "description": "Snowflake account identifier"},
-                    "user": {"type": "string", "description": "Snowflake username"}
-                },
-                "required": ["account", "user"]
-            },
-            "list_saved_credentials": {
-                "type": "object",
-                "properties": {}
-            },
-            "delete_saved_credentials": {
-                "type": "object",
-                "properties": {
-                    "account": {"type": "string", "description": "Snowflake account identifier"},
-                    "user": {"type": "string", "description": "Snowflake username"}
-                }
-            },
-            "list_databases": {
-                "type": "object",
-                "properties": {}
-            },
-            "list_schemas": {
-                "type": "object",
-                "properties": {
-                    "database": {"type": "string", "description": "Database name"}
-                },
-                "required": ["database"]
-            },
-            "list_tables": {
-                "type": "object",
-                "properties": {
-                    "database": {"type": "string", "description": "Database name"},
-                    "schema": {"type": "string", "description": "Schema name"}
-                },
-                "required": ["database", "schema"]
-            },
-            "describe_table": {
-                "type": "object",
-                "properties": {
-                    "table_name": {"type": "string", "description": "Fully qualified table name"}
-                },
-                "required": ["table_name"]
-            },
-            "read_query": {
-                "type": "object",
-                "properties": {
-                    "query": {"type": "string", "description": "SELECT SQL query to execute"}
-                },
-                "required": ["query"]
-            }
-        }
-        return schemas.get(tool_name, {"type": "object", "properties": {}})
+        return _TOOL_SCHEMAS.get(tool_name, _EMPTY_SCHEMA)
+
+async def _receive_message(websocket: WebSocket) -> Any:
+    """Receive one text or binary frame and parse it with _loads."""
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    data = message.get("bytes")
+    return _loads(data if data is not None else message["text"])
+
+async def _send_message(websocket: WebSocket, payload: Dict[str, Any]):
+    """Serialize with _dumps_bytes and send as a text frame, like send_json."""
+    await websocket.send_text(_dumps_bytes(payload).decode())
 
 # Create a global handler instance
 handler = MCPWebSocketHandler()
 
+async def _process(message: Any, out_queue: asyncio.Queue):
+    """Handle one request and queue its response."""
+    out_queue.put_nowait(await handler.handle_request(message))
+
+async def _write_responses(websocket: WebSocket, out_queue: asyncio.Queue):
+    """Send queued responses; the only coroutine writing to the socket."""
+    while True:
+        response = await out_queue.get()
+        await _send_message(websocket, response)
+        logger.debug("Sent: %s", response)
+
 @app.websocket("/mcp")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for MCP communication."""
     await websocket.accept()
     logger.info(f"WebSocket client connected from {websocket.client}")
     
+    # Requests run concurrently and their responses (matched by id) are
+    # sent in completion order through a single writer
+    out_queue: asyncio.Queue = asyncio.Queue()
+    writer_task = asyncio.create_task(_write_responses(websocket, out_queue))
+    in_flight = set()
+    
     try:
         while True:
             # Receive message
             try:
-                message = await websocket.receive_json()
-                logger.debug(f"Received: {message}")
+                message = await _receive_message(websocket)
+                logger.debug("Received: %s", message)
                 
                 # Handle the request
-                response = await handler.handle_request(message)
-                
-                # Send response
-                await websocket.send_json(response)
-                logger.debug(f"Sent: {response}")
+                task = asyncio.create_task(_process(message, out_queue))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
                 
             except WebSocketDisconnect:
                 logger.info("WebSocket client disconnected")
                 break
             except json.JSONDecodeError as e:
-                logger.error(f"Invalid JSON: {e}")
-                await websocket.send_json({
+                logger.error("Invalid JSON: %s", e)
+                out_queue.put_nowait({
                     "jsonrpc": "2.0",
                     "error": {
                         "code": -32700,
@@ -364,6 +444,9 @@ async def websocket_endpoint(websocket: WebSocket):
     except Exception as e:
         logger.error(f"WebSocket error: {e}", exc_info=True)
     finally:
+        for task in in_flight:
+            task.cancel()
+        writer_task.cancel()
         logger.info("WebSocket connection closed")
 
 @app.get("/")
@@ -375,6 +458,9 @@ async def main():
     """Run the WebSocket server."""
     host = os.getenv("WS_HOST", "0.0.0.0")
     port = int(os.getenv("WS_PORT", "8765"))
+    # permessage-deflate trades CPU on every frame for bandwidth; turn it off
+    # when clients are close by and most messages are small
+    per_message_deflate = os.getenv("WS_PER_MESSAGE_DEFLATE", "true").lower() == "true"
     
     logger.info(f"Starting Snowflake MCP WebSocket server on {host}:{port}")
     
@@ -382,10 +468,17 @@ async def main():
         app,
         host=host,
         port=port,
-        log_level="info"
+        log_level="info",
+        ws_per_message_deflate=per_message_deflate
     )
     server = uvicorn.Server(config)
     await server.serve()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    # uvloop is optional (the "speedups" extra) and not available on Windows
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
\ No newline at end of file